@@ -1,22 +1,41 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Union, Dict
-import yfinance as yf
+import json
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from typing import AsyncIterator, List, Optional, Union
 
 from database.models import Asset
 from api.schemas import AssetModel
+from model_core import asset_metadata
+from utils.catalog_cache import (
+    ASSETS,
+    catalog_cache,
+    catalog_response,
+    table_version,
+)
 from utils.logger import make_log
 
 router = APIRouter()
 
+assets_adapter = TypeAdapter(List[AssetModel])
+
+
+@lru_cache(maxsize=None)
+def get_metadata_provider() -> asset_metadata.MetadataProvider:
+    """Provider selected by ASSET_METADATA_PROVIDER; override the dependency to swap it"""
+    return asset_metadata.get_provider()
+
 
 @router.get("/", response_model=List[AssetModel])
-async def read_all_assets():
-    asset_queryset = await Asset.all()
-    if asset_queryset is None:
-        raise HTTPException(
-            status_code=500,
-            detail="Server error: assets could not be retrieved")
-    return asset_queryset
+async def read_all_assets(if_none_match: Optional[str] = Header(None)):
+    async def load() -> bytes:
+        return assets_adapter.dump_json(
+            assets_adapter.validate_python(await Asset.all(), from_attributes=True)
+        )
+
+    return await catalog_response(ASSETS, load, table_version(Asset), if_none_match)
 
 
 @router.get("/{ticker}", response_model=AssetModel)
@@ -28,48 +47,59 @@ async def read_asset(ticker: str):
 
 
 @router.post("/bulk-add")
-async def bulk_add(tickers: Union[str, List[str]]
-                   ) -> Dict[str, Dict[str, str]]:
+async def bulk_add(
+    tickers: Union[str, List[str]],
+    provider: asset_metadata.MetadataProvider = Depends(get_metadata_provider),
+) -> StreamingResponse:
+    """Adds assets for the tickers, streaming one {"ticker", "status"} JSON line
+    per ticker as soon as its outcome is known"""
     if isinstance(tickers, str):
         tickers = [tickers]
+    tickers = list(dict.fromkeys(tickers))
+
+    async def results() -> AsyncIterator[bytes]:
+        def line(ticker: str, status: str) -> bytes:
+            return (json.dumps({"ticker": ticker, "status": status}) + "\n").encode()
 
-    response = {}
-
-    valid_assets = []
-    for ticker in tickers:
-        # try:
-        data = yf.Ticker(ticker).info  # Not sure if this raises an exception
-        # except Exception as e:
-        #     make_log(
-        #         "ASSETS",
-        #         40,
-        #         "api_error.log",
-        #         f"Error fetching data for {ticker}: {str(e)}",
-        #     )
-
-        if data.get("shortName") is None:
-            response[ticker] = "No data found. Ticker might be invalid"
-            continue
-
-        if await Asset.exists(ticker=ticker):
-            response[ticker] = "Asset already in database"
-            continue
-
-        valid_assets.append(
-            {
-                "ticker": ticker,
-                "name": data.get("shortName", None),
-                "asset_type": data.get("quoteType", None),
-                "sector": data.get("sector", None),
-            }
+        existing = set(
+            await Asset.filter(ticker__in=tickers).values_list("ticker", flat=True)
         )
+        for ticker in tickers:
+            if ticker in existing:
+                yield line(ticker, "Asset already in database")
 
-    if valid_assets:
-        await Asset.bulk_create([Asset(**asset) for asset in valid_assets])
-        for asset in valid_assets:
-            if not await Asset.exists(ticker=asset["ticker"]):
-                response[asset["ticker"]] = "Data could not be stored"
+        valid_assets = []
+        async for ticker, data in asset_metadata.fetch_all(
+            [t for t in tickers if t not in existing], provider
+        ):
+            if data is None:
+                yield line(ticker, "No data found. Ticker might be invalid")
                 continue
-            response[asset["ticker"]] = "Data stored"
+            valid_assets.append(Asset(ticker=ticker, **data))
+
+        if not valid_assets:
+            return
+        try:
+            # Tickers another request stored in the meantime are skipped, not errors
+            await Asset.bulk_create(valid_assets, ignore_conflicts=True)
+            catalog_cache.invalidate(ASSETS)
+            stored = set(
+                await Asset.filter(
+                    ticker__in=[asset.ticker for asset in valid_assets]
+                ).values_list("ticker", flat=True)
+            )
+        except Exception as e:
+            make_log(
+                "ASSETS",
+                40,
+                "api_error.log",
+                f"Error storing {len(valid_assets)} assets: {str(e)}",
+            )
+            stored = set()
+        for asset in valid_assets:
+            yield line(
+                asset.ticker,
+                "Data stored" if asset.ticker in stored else "Data could not be stored",
+            )
 
-    return {"message": response}
\ No newline at end of file
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -1,21 +1,32 @@
-from typing import List, Dict
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+from pydantic import TypeAdapter
+from tortoise.exceptions import DoesNotExist
 
 from database.models import ModelType, Asset, Queue, User
-from api.schemas import ModelTypeModel
+from api.schemas import (
+    ModelTypeModel,
+    BulkEnqueueRequest,
+    BulkEnqueueResult,
+)
+from model_core import request_coalescing, inference, forecasting, cost_model
+from model_core.micro_batcher import micro_batcher, BatcherFull
+from utils.catalog_cache import MODEL_TYPES, catalog_response, table_version
 from utils.logger import make_log
 
 router = APIRouter()
 
+model_types_adapter = TypeAdapter(List[ModelTypeModel])
+
 
 @router.get("/", response_model=List[ModelTypeModel])
-async def read_all_models():
-    model_queryset = await ModelType.all()
-    if model_queryset is None:
-        raise HTTPException(
-            status_code=500, detail="Server error: model types could not be retrieved"
+async def read_all_models(if_none_match: Optional[str] = Header(None)):
+    async def load() -> bytes:
+        return model_types_adapter.dump_json(
+            model_types_adapter.validate_python(await ModelType.all(), from_attributes=True)
         )
-    return model_queryset
+
+    return await catalog_response(MODEL_TYPES, load, table_version(ModelType), if_none_match)
 
 
 @router.get("/{model_name}", response_model=ModelTypeModel)
@@ -26,28 +37,128 @@ async def read_model(model_name: str):
     return model
 
 
+@router.get("/inference/metrics")
+async def inference_metrics() -> Dict[int, Dict[str, Any]]:
+    return micro_batcher.metrics()
+
+
+@router.get("/queue/capacity")
+async def queue_capacity() -> Dict[str, Any]:
+    return await cost_model.capacity()
+
+
+@router.get("/queue/{queue_id}/eta")
+async def queue_eta(queue_id: int) -> Dict[str, Any]:
+    eta = await cost_model.queue_eta(queue_id)
+    if eta is None:
+        raise HTTPException(status_code=404, detail="Request not found in queue")
+    return eta
+
+
+@router.get("/{trained_model_id}/predict")
+async def predict(trained_model_id: int) -> Dict[str, Any]:
+    try:
+        return await inference.predict(trained_model_id)
+    except DoesNotExist:
+        raise HTTPException(status_code=404, detail="Trained model not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BatcherFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/{trained_model_id}/forecast")
+async def read_forecast(trained_model_id: int) -> Dict[str, Any]:
+    forecast = await forecasting.read_forecast(trained_model_id)
+    if forecast is None:
+        raise HTTPException(status_code=404, detail="Forecast not found")
+    return forecast
+
+
 @router.post("/enqueue")
 async def enqueue_model(
-    model_id: int, ticker: str, user_id: int
+    model_id: int,
+    ticker: str,
+    user_id: int,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
 ) -> Dict[str, str]:
     if not ticker or not model_id:
         raise HTTPException(status_code=400, detail="Missing ticker or model type id")
 
     asset = await Asset.filter(ticker=ticker).first()
-    make_log("MODEL", 20, "api_workflow.log", f"Asset from request: {asset.ticker}")
     if asset is None:
         raise HTTPException(status_code=404, detail=f"Error retrieving ticker")
+    make_log("MODEL", 20, "api_workflow.log", f"Asset from request: {asset.ticker}")
 
     model_type = await ModelType.filter(id=model_id).first()
     if model_type is None:
         raise HTTPException(status_code=404, detail=f"Error retrieving model_type")
     make_log("MODEL", 20, "api_workflow.log", f"Model from request: {model_type.id}")
 
-    enqueued_model = await Queue.create(
-        user=user_id, asset=asset, model_type=model_type
+    outcome, object_id = await request_coalescing.enqueue_request(
+        user_id, asset.id, model_type, request_key=idempotency_key
+    )
+    if outcome == request_coalescing.DUPLICATE:
+        return {"message": f"Request already received. ID: {object_id}"}
+    if outcome == request_coalescing.TRAINED:
+        return {"message": f"Model already trained. ID: {object_id}"}
+    if outcome == request_coalescing.ATTACHED:
+        return {"message": f"Identical request already queued. ID: {object_id}"}
+    return {"message": f"Model enqueued. ID: {object_id}"}
+
+
+@router.post("/enqueue/bulk", response_model=List[BulkEnqueueResult])
+async def enqueue_models_bulk(body: BulkEnqueueRequest) -> List[BulkEnqueueResult]:
+    """Enqueues many requests with one query per table, returning a result per item"""
+    items = body.requests
+    assets = dict(
+        await Asset.filter(ticker__in={item.ticker for item in items}).values_list(
+            "ticker", "id")
+    )
+    model_types = {
+        model_type.id: model_type
+        for model_type in await ModelType.filter(
+            id__in={item.model_id for item in items})
+    }
+    priorities = dict(
+        await User.filter(id__in={item.user_id for item in items}).values_list(
+            "id", "priority")
     )
-    if not enqueued_model:
-        raise HTTPException(
-            status_code=500, detail="Server error: could not enqueue model"
+
+    results: List[BulkEnqueueResult] = []
+    requests, positions = [], []
+    for index, item in enumerate(items):
+        result = BulkEnqueueResult(
+            index=index, ticker=item.ticker, model_id=item.model_id, outcome="not_found"
         )
-    return {"message": f"Model enqueued. ID: {enqueued_model.id}"}
+        results.append(result)
+        if item.ticker not in assets:
+            result.detail = "Unknown ticker"
+        elif item.model_id not in model_types:
+            result.detail = "Unknown model type"
+        elif item.user_id not in priorities:
+            result.detail = "Unknown user"
+        else:
+            requests.append(
+                request_coalescing.EnqueueRequest(
+                    user_id=item.user_id,
+                    asset_id=assets[item.ticker],
+                    model_type=model_types[item.model_id],
+                    priority=priorities[item.user_id],
+                    request_key=item.idempotency_key,
+                )
+            )
+            positions.append(index)
+
+    for index, (outcome, object_id) in zip(
+        positions, await request_coalescing.enqueue_requests(requests)
+    ):
+        results[index].outcome = outcome
+        results[index].id = object_id
+    make_log(
+        "MODEL",
+        20,
+        "api_workflow.log",
+        f"Bulk enqueue of {len(items)} requests, {len(requests)} valid",
+    )
+    return results
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+import os
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+
+BULK_ENQUEUE_MAX_ITEMS = int(os.getenv("BULK_ENQUEUE_MAX_ITEMS", "5000"))
 
 
 class ModelTypeModel(BaseModel):
@@ -17,6 +20,28 @@ class ModelEnqueueRequest(BaseModel):
     model_config = ConfigDict(from_attributes=True, protected_namespaces=())
 
 
+class BulkEnqueueItem(BaseModel):
+    ticker: str
+    model_id: int
+    user_id: int
+    idempotency_key: Optional[str] = Field(None, max_length=128)
+    model_config = ConfigDict(protected_namespaces=())
+
+
+class BulkEnqueueRequest(BaseModel):
+    requests: List[BulkEnqueueItem] = Field(max_length=BULK_ENQUEUE_MAX_ITEMS)
+
+
+class BulkEnqueueResult(BaseModel):
+    index: int
+    ticker: str
+    model_id: int
+    outcome: str  # trained, attached, queued, duplicate or not_found
+    id: Optional[int] = None
+    detail: Optional[str] = None
+    model_config = ConfigDict(protected_namespaces=())
+
+
 class AssetModel(BaseModel):
     id: int
     ticker: str
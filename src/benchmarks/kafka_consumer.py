@@ -0,0 +1,159 @@
+"""Throughput (msgs/sec) of the Kafka queue consumer, per message vs batched.
+
+Messages come from an in-memory stand-in for the consumer and land in an in-memory
+SQLite database, so the numbers isolate the consumer and ORM cost from the broker
+and MySQL round trips (which only widen the gap in favour of batching).
+
+Run from src/: python -m benchmarks.kafka_consumer
+"""
+import asyncio
+import json
+import random
+import time
+from typing import List, Optional
+
+from tortoise import Tortoise
+
+from database.models import Asset, ModelType, User
+from kafka.services import BATCH_SIZE, DeadLetterQueue, process_batch
+from model_core import request_coalescing
+
+MESSAGES = 5000
+USERS = 200
+ASSETS = 2000
+PARTITIONS = 3
+
+
+class FakeMessage:
+    def __init__(self, value: bytes, partition: int = 0, offset: int = 0):
+        self._value = value
+        self._partition = partition
+        self._offset = offset
+
+    def value(self) -> bytes:
+        return self._value
+
+    def key(self) -> Optional[bytes]:
+        return None
+
+    def topic(self) -> str:
+        return "train"
+
+    def partition(self) -> int:
+        return self._partition
+
+    def offset(self) -> int:
+        return self._offset
+
+    def error(self) -> Optional[Exception]:
+        return None
+
+
+class FakeConsumer:
+    def __init__(self, messages: List[FakeMessage]):
+        self.messages = messages
+        self.position = 0
+        self.commits = 0
+
+    def poll(self, timeout: float = None) -> Optional[FakeMessage]:
+        batch = self.consume(1, timeout)
+        return batch[0] if batch else None
+
+    def consume(self, num_messages: int, timeout: float = None) -> List[FakeMessage]:
+        batch = self.messages[self.position:self.position + num_messages]
+        self.position += len(batch)
+        return batch
+
+    def commit(
+        self, message: FakeMessage = None, offsets=None, asynchronous: bool = True
+    ) -> None:
+        self.commits += 1
+
+
+def make_messages(n: int) -> List[FakeMessage]:
+    rng = random.Random(0)
+    return [
+        FakeMessage(
+            json.dumps(
+                {
+                    "user_id": rng.randint(1, USERS),
+                    "asset_id": rng.randint(1, ASSETS),
+                    "model_type_id": 1,
+                }
+            ).encode("utf-8"),
+            partition=i % PARTITIONS,
+            offset=i // PARTITIONS,
+        )
+        for i in range(n)
+    ]
+
+
+async def setup_database() -> None:
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["database.models"]}
+    )
+    await Tortoise.generate_schemas()
+    await User.bulk_create(
+        [
+            User(username=f"user{i}", email=f"user{i}@typhoon", password="-",
+                 priority=i % 5 == 0)
+            for i in range(1, USERS + 1)
+        ]
+    )
+    await Asset.bulk_create(
+        [
+            Asset(ticker=f"T{i}", name=f"Asset {i}", asset_type="stock")
+            for i in range(1, ASSETS + 1)
+        ]
+    )
+    await ModelType.create(
+        model_name="LSTM",
+        description="",
+        default_hyperparameters={"units": 50},
+        default_model_architecture={},
+    )
+
+
+async def per_message(consumer: FakeConsumer) -> None:
+    """The previous consumer: one user lookup, enqueue and commit per message"""
+    model_type = await ModelType.get(id=1)
+    while True:
+        msg = consumer.poll()
+        if msg is None:
+            return
+        data = json.loads(msg.value().decode("utf-8"))
+        priority = (await User.get(id=data["user_id"])).priority
+        await request_coalescing.enqueue_request(
+            data["user_id"], data["asset_id"], model_type, priority=priority
+        )
+        consumer.commit(msg)
+
+
+async def batched(consumer: FakeConsumer) -> None:
+    while True:
+        messages = consumer.consume(BATCH_SIZE, 0)
+        if not messages:
+            return
+        await process_batch(consumer, messages, DeadLetterQueue(topic=None))
+
+
+async def measure(name: str, consume) -> None:
+    await setup_database()
+    consumer = FakeConsumer(make_messages(MESSAGES))
+    start = time.perf_counter()
+    await consume(consumer)
+    elapsed = time.perf_counter() - start
+    await Tortoise.close_connections()
+    print(
+        f"{name:>12}: {MESSAGES / elapsed:10.0f} msgs/s "
+        f"({elapsed:.2f}s, {consumer.commits} commits)"
+    )
+
+
+async def main() -> None:
+    await measure("per message", per_message)
+    await measure("batched", batched)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
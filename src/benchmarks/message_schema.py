@@ -0,0 +1,44 @@
+"""Payload size and decode cost of training requests, JSON vs the binary schema.
+
+Run from src/: python -m benchmarks.message_schema
+"""
+import random
+import time
+
+from kafka.schemas import KafkaQueueMessage, decode, encode, encode_json
+
+MESSAGES = 200_000
+
+
+def make_messages(n: int):
+    rng = random.Random(0)
+    return [
+        KafkaQueueMessage(
+            user_id=rng.randint(1, 100_000),
+            asset_id=rng.randint(1, 20_000),
+            model_type_id=rng.randint(1, 10),
+        )
+        for _ in range(n)
+    ]
+
+
+def measure(name: str, payloads) -> None:
+    start = time.perf_counter()
+    for payload in payloads:
+        decode(payload)
+    elapsed = time.perf_counter() - start
+    size = sum(len(payload) for payload in payloads) / len(payloads)
+    print(
+        f"{name:>6}: {size:5.1f} bytes/msg, {elapsed / len(payloads) * 1e6:5.2f} us/msg decode, "
+        f"{len(payloads) / elapsed:10.0f} msgs/s"
+    )
+
+
+def main() -> None:
+    messages = make_messages(MESSAGES)
+    measure("json", [encode_json(message) for message in messages])
+    measure("binary", [encode(message) for message in messages])
+
+
+if __name__ == "__main__":
+    main()
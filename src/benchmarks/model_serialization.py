@@ -0,0 +1,75 @@
+"""Size and time of in-memory model serialization against the SavedModel round trip.
+
+Run from src/: python -m benchmarks.model_serialization
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from model_core.model_utils.model_serializer import serialize_model, deserialize_model
+
+REPEATS = 5
+VARIANTS = {
+    "npz": {"compression": "none", "float16": False},
+    "npz+zstd": {"compression": "zstd", "float16": False},
+    "npz+fp16": {"compression": "none", "float16": True},
+    "npz+zstd+fp16": {"compression": "zstd", "float16": True},
+}
+
+
+def trained_lstm(units: int = 50, n_features: int = 11) -> tf.keras.Model:
+    model = tf.keras.Sequential([tf.keras.layers.LSTM(units), tf.keras.layers.Dense(1)])
+    model.compile(optimizer="adam", loss="mse")
+    x = np.random.rand(64, 30, n_features).astype(np.float32)
+    model.fit(x, np.random.rand(64, 1), epochs=1, verbose=0)
+    return model
+
+
+def saved_model_round_trip(model: tf.keras.Model):
+    """What the trainer used to do: save to disk, read the bytes back, delete"""
+    directory = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        model.save(directory)
+        size = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(directory)
+            for name in names
+        )
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        tf.keras.models.load_model(directory)
+        load_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+    return size, save_time, load_time
+
+
+def in_memory_round_trip(model: tf.keras.Model, **options):
+    start = time.perf_counter()
+    blob = serialize_model(model, **options)
+    save_time = time.perf_counter() - start
+    start = time.perf_counter()
+    deserialize_model(blob)
+    load_time = time.perf_counter() - start
+    return len(blob), save_time, load_time
+
+
+def main() -> None:
+    model = trained_lstm()
+    rows = {"SavedModel": [saved_model_round_trip(model) for _ in range(REPEATS)]}
+    for name, options in VARIANTS.items():
+        rows[name] = [in_memory_round_trip(model, **options) for _ in range(REPEATS)]
+
+    print(f"{'format':<16}{'bytes':>10}{'save (ms)':>12}{'load (ms)':>12}")
+    for name, results in rows.items():
+        size, save_time, load_time = np.median(np.array(results), axis=0)
+        print(f"{name:<16}{int(size):>10}{save_time * 1e3:>12.1f}{load_time * 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Epoch time of WindowGenerator datasets with and without split caching.
+
+Run from src/: python -m benchmarks.window_datasets
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from model_core.model_utils.window_generator import WindowGenerator
+from model_core.model_utils.window_pipeline import data_split, data_normalization
+
+SERIES = {
+    "10y daily": 252 * 10,
+    "2y hourly": 252 * 2 * 7,
+}
+EPOCHS = 3
+
+
+def synthetic_ohlcv(n_rows: int, n_features: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_rows))
+    noise = rng.normal(0, 0.5, (n_rows, n_features - 1))
+    columns = ["Close"] + [f"f{i}" for i in range(n_features - 1)]
+    return pd.DataFrame(np.column_stack([close, close[:, None] + noise]), columns=columns)
+
+
+def epoch_times(df: pd.DataFrame, cache) -> list:
+    train_df, val_df, test_df = data_normalization(*data_split(df))
+    window = WindowGenerator(
+        input_width=30,
+        label_width=1,
+        shift=1,
+        train_df=train_df,
+        val_df=val_df,
+        test_df=test_df,
+        label_columns=["Close"],
+        cache=cache,
+    )
+    model = tf.keras.Sequential(
+        [tf.keras.layers.LSTM(50), tf.keras.layers.Dense(1)]
+    )
+    model.compile(optimizer="adam", loss="mse")
+
+    times = []
+    for _ in range(EPOCHS):
+        start = time.perf_counter()
+        model.fit(window.train, validation_data=window.val, epochs=1, verbose=0)
+        model.evaluate(window.val, verbose=0)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> None:
+    print(f"{'series':<12}{'mode':<10}{'first epoch (s)':>18}{'steady epoch (s)':>18}")
+    for name, n_rows in SERIES.items():
+        df = synthetic_ohlcv(n_rows)
+        for mode in (None, "memory"):
+            times = epoch_times(df, mode)
+            print(
+                f"{name:<12}{str(mode):<10}{times[0]:>18.3f}{np.mean(times[1:]):>18.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Training throughput (jobs/hour) of the worker pool at 1, 2, 4 and 8 workers.
+
+Every run trains the same fixed synthetic workload: JOBS LSTM fits of EPOCHS
+epochs each on a 10y daily series, with cores split evenly across workers.
+
+Run from src/: python -m benchmarks.worker_pool
+"""
+import multiprocessing
+import time
+
+from benchmarks.window_datasets import synthetic_ohlcv
+from utils.tf_threads import configure_tf_threads, default_intra_op_threads
+
+POOL_SIZES = (1, 2, 4, 8)
+JOBS = 16
+EPOCHS = 3
+ROWS = 252 * 10
+
+
+def train_job(seed: int) -> float:
+    import tensorflow as tf
+
+    from model_core.model_utils.window_generator import WindowGenerator
+    from model_core.model_utils.window_pipeline import data_split, data_normalization
+
+    tf.random.set_seed(seed)
+    train_df, val_df, test_df = data_normalization(*data_split(synthetic_ohlcv(ROWS)))
+    window = WindowGenerator(
+        input_width=30,
+        label_width=1,
+        shift=1,
+        train_df=train_df,
+        val_df=val_df,
+        test_df=test_df,
+        label_columns=["Close"],
+    )
+    model = tf.keras.Sequential([tf.keras.layers.LSTM(50), tf.keras.layers.Dense(1)])
+    model.compile(optimizer="adam", loss="mse")
+
+    start = time.perf_counter()
+    model.fit(window.train, validation_data=window.val, epochs=EPOCHS, verbose=0)
+    return time.perf_counter() - start
+
+
+def jobs_per_hour(pool_size: int) -> float:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        pool_size,
+        initializer=configure_tf_threads,
+        initargs=(default_intra_op_threads(pool_size), 1),
+    ) as pool:
+        # Warm up every worker so TensorFlow import time is not counted
+        pool.map(time.sleep, [0.5] * pool_size)
+        start = time.perf_counter()
+        pool.map(train_job, range(JOBS))
+        elapsed = time.perf_counter() - start
+    return JOBS / elapsed * 3600
+
+
+def main() -> None:
+    print(f"{'workers':<10}{'intra threads':>15}{'jobs/hour':>12}")
+    for pool_size in POOL_SIZES:
+        print(
+            f"{pool_size:<10}{default_intra_op_threads(pool_size):>15}{jobs_per_hour(pool_size):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
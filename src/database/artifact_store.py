@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import aiofiles
+
+from utils.logger import make_log
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(current_dir, "..", "..")
+
+ARTIFACT_STORE = os.getenv("ARTIFACT_STORE", "local")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(root, "artifacts"))
+ARTIFACT_S3_BUCKET = os.getenv("ARTIFACT_S3_BUCKET", "typhoon-artifacts")
+ARTIFACT_S3_ENDPOINT = os.getenv("ARTIFACT_S3_ENDPOINT")
+CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class ArtifactRef:
+    key: str  # sha256 hex digest of the content
+    size: int
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+class ArtifactStore(ABC):
+    """Content-addressed blob store: artifacts are keyed by the sha256 of their
+    bytes, so storing the same artifact twice keeps a single copy"""
+
+    async def put(self, data: bytes) -> ArtifactRef:
+        return await self.put_stream(_single_chunk(data))
+
+    async def get(self, key: str) -> bytes:
+        chunks = [chunk async for chunk in self.open_stream(key)]
+        data = b"".join(chunks)
+        if hashlib.sha256(data).hexdigest() != key:
+            raise ValueError(f"Artifact {key} failed checksum verification")
+        return data
+
+    @abstractmethod
+    async def put_stream(self, chunks: AsyncIterable[bytes]) -> ArtifactRef:
+        pass
+
+    @abstractmethod
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        pass
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class LocalArtifactStore(ArtifactStore):
+    def __init__(self, base_dir: str = ARTIFACT_DIR):
+        self.base_dir = base_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base_dir, key[:2], key[2:4], key)
+
+    async def put_stream(self, chunks: AsyncIterable[bytes]) -> ArtifactRef:
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = os.path.join(self.base_dir, f".{uuid.uuid4().hex}.tmp")
+        digest, size = hashlib.sha256(), 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as file:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await file.write(chunk)
+
+            ref = ArtifactRef(digest.hexdigest(), size)
+            path = self._path(ref.key)
+            if os.path.exists(path):
+                return ref
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return ref
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self._path(key), "rb") as file:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    async def delete(self, key: str) -> None:
+        if os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+
+class S3ArtifactStore(ArtifactStore):
+    """Stores artifacts in any S3-compatible service (AWS, MinIO, a local stand-in).
+
+    client is a boto3-style S3 client; its blocking calls run in the default executor.
+    """
+
+    def __init__(self, client, bucket: str = ARTIFACT_S3_BUCKET):
+        self.client = client
+        self.bucket = bucket
+
+    async def _run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: func(*args, **kwargs)
+        )
+
+    async def put_stream(self, chunks: AsyncIterable[bytes]) -> ArtifactRef:
+        digest, size = hashlib.sha256(), 0
+        with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 8) as buffer:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                buffer.write(chunk)
+
+            ref = ArtifactRef(digest.hexdigest(), size)
+            if not await self.exists(ref.key):
+                buffer.seek(0)
+                await self._run(
+                    self.client.upload_fileobj, buffer, self.bucket, ref.key
+                )
+        return ref
+
+    async def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        response = await self._run(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = response["Body"]
+        while True:
+            chunk = await self._run(body.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self._run(self.client.head_object, Bucket=self.bucket, Key=key)
+        except Exception:
+            return False
+        return True
+
+    async def delete(self, key: str) -> None:
+        await self._run(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Returns the process-wide store selected by ARTIFACT_STORE ("local" or "s3")"""
+    global _store
+    if _store is None:
+        if ARTIFACT_STORE == "s3":
+            try:
+                import boto3  # Only needed when artifacts live in S3
+            except ImportError as e:
+                raise ImportError(
+                    "ARTIFACT_STORE=s3 needs boto3, install the s3 extra: "
+                    "poetry install --extras s3"
+                ) from e
+
+            _store = S3ArtifactStore(
+                boto3.client("s3", endpoint_url=ARTIFACT_S3_ENDPOINT)
+            )
+        else:
+            _store = LocalArtifactStore()
+        make_log(
+            "ARTIFACT_STORE",
+            20,
+            "artifact_store.log",
+            f"Using {type(_store).__name__}",
+        )
+    return _store
+
+
+async def read_serialized_model(instance) -> bytes:
+    """Returns the model bytes of a TrainedModel/TempModel, wherever they are stored"""
+    if instance.artifact_key:
+        return await get_artifact_store().get(instance.artifact_key)
+    return instance.serialized_model
@@ -0,0 +1,56 @@
+"""Moves serialized models stored inline in MySQL into the artifact store.
+
+Run once after applying the artifact store migration, from src/:
+    python -m database.management.commands.move_model_blobs
+"""
+import os
+
+from dotenv import load_dotenv
+from tortoise import Tortoise, run_async
+
+from database.artifact_store import get_artifact_store
+from database.models import TrainedModel, TempModel
+from utils.logger import make_log
+
+
+async def move_blobs(model_class) -> int:
+    store = get_artifact_store()
+    ids = await model_class.filter(
+        artifact_key__isnull=True, serialized_model__isnull=False
+    ).values_list("id", flat=True)
+
+    for instance_id in ids:
+        instance = await model_class.get(id=instance_id).only("id", "serialized_model")
+        artifact = await store.put(bytes(instance.serialized_model))
+        await model_class.filter(id=instance_id).update(
+            artifact_key=artifact.key,
+            artifact_size=artifact.size,
+            serialized_model=None,
+        )
+        make_log(
+            "MOVE_MODEL_BLOBS",
+            20,
+            "artifact_store.log",
+            f"{model_class.__name__} {instance_id} moved to artifact {artifact.key}",
+        )
+    return len(ids)
+
+
+async def main() -> None:
+    load_dotenv()
+    await Tortoise.init(
+        db_url=os.getenv("DB_URL"),
+        modules={"models": ["database.models"]},
+    )
+    for model_class in (TrainedModel, TempModel):
+        moved = await move_blobs(model_class)
+        make_log(
+            "MOVE_MODEL_BLOBS",
+            20,
+            "artifact_store.log",
+            f"Moved {moved} {model_class.__name__} blobs",
+        )
+
+
+if __name__ == "__main__":
+    run_async(main())
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS `forecast` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `horizon` INT NOT NULL,
+    `last_bar_date` VARCHAR(10) NOT NULL,
+    `values` JSON NOT NULL,
+    `updated_at` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    `asset_id` INT NOT NULL,
+    `trained_model_id` INT NOT NULL UNIQUE,
+    CONSTRAINT `fk_forecast_asset_3b8e21c9` FOREIGN KEY (`asset_id`) REFERENCES `asset` (`id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_forecast_trainedm_7f4d0a62` FOREIGN KEY (`trained_model_id`) REFERENCES `trainedmodel` (`id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `forecast`;"""
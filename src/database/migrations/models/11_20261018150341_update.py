@@ -0,0 +1,28 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS `jobtiming` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `queue_id` INT,
+    `bars` INT NOT NULL,
+    `features` INT NOT NULL,
+    `input_width` INT NOT NULL,
+    `hyperparameters` JSON NOT NULL,
+    `epochs` INT,
+    `warm_started` BOOL NOT NULL  DEFAULT 0,
+    `searched` BOOL NOT NULL  DEFAULT 0,
+    `fit_seconds` DOUBLE NOT NULL,
+    `created_at` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `asset_id` INT NOT NULL,
+    `model_type_id` INT NOT NULL,
+    CONSTRAINT `fk_jobtimin_asset_c41e7b03` FOREIGN KEY (`asset_id`) REFERENCES `asset` (`id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_jobtimin_modeltyp_58a2f9d1` FOREIGN KEY (`model_type_id`) REFERENCES `modeltype` (`id`) ON DELETE CASCADE,
+    KEY `idx_jobtiming_created_6b0d4e` (`created_at`)
+) CHARACTER SET utf8mb4;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `jobtiming`;"""
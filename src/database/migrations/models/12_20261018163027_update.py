@@ -0,0 +1,12 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `requestsubscription` ADD `request_key` VARCHAR(128) UNIQUE;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `requestsubscription` DROP INDEX `request_key`;
+        ALTER TABLE `requestsubscription` DROP COLUMN `request_key`;"""
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `queue` ADD `status` VARCHAR(20) NOT NULL  DEFAULT 'pending';
+        ALTER TABLE `queue` ADD `claimed_by` VARCHAR(100);
+        ALTER TABLE `queue` ADD `lease_expires_at` DATETIME(6);
+        ALTER TABLE `queue` ADD INDEX `idx_queue_status_0a3f1c` (`status`, `priority`, `created_at`);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `queue` DROP INDEX `idx_queue_status_0a3f1c`;
+        ALTER TABLE `queue` DROP COLUMN `status`;
+        ALTER TABLE `queue` DROP COLUMN `claimed_by`;
+        ALTER TABLE `queue` DROP COLUMN `lease_expires_at`;"""
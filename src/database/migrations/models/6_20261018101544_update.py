@@ -0,0 +1,29 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `queue` ADD `fingerprint` VARCHAR(64) UNIQUE;
+        ALTER TABLE `trainedmodel` ADD `fingerprint` VARCHAR(64);
+        ALTER TABLE `trainedmodel` ADD INDEX `idx_trainedmode_fingerp_5b1e7d` (`fingerprint`);
+        CREATE TABLE IF NOT EXISTS `requestsubscription` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `fingerprint` VARCHAR(64) NOT NULL,
+    `created_at` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `status` VARCHAR(25) NOT NULL  DEFAULT 'queued',
+    `queue_id` INT,
+    `trained_model_id` INT,
+    `user_id` INT NOT NULL,
+    CONSTRAINT `fk_requests_queue_8d2c41e0` FOREIGN KEY (`queue_id`) REFERENCES `queue` (`id`) ON DELETE SET NULL,
+    CONSTRAINT `fk_requests_trainedm_3a9f6b12` FOREIGN KEY (`trained_model_id`) REFERENCES `trainedmodel` (`id`) ON DELETE SET NULL,
+    CONSTRAINT `fk_requests_user_c47e0d95` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`) ON DELETE CASCADE,
+    KEY `idx_requestsub_fingerp_e61c0a` (`fingerprint`)
+) CHARACTER SET utf8mb4;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `requestsubscription`;
+        ALTER TABLE `trainedmodel` DROP INDEX `idx_trainedmode_fingerp_5b1e7d`;
+        ALTER TABLE `trainedmodel` DROP COLUMN `fingerprint`;
+        ALTER TABLE `queue` DROP COLUMN `fingerprint`;"""
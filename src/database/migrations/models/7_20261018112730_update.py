@@ -0,0 +1,27 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS `hyperparametertrial` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `search_id` VARCHAR(36) NOT NULL,
+    `hyperparameters` JSON NOT NULL,
+    `rung` INT NOT NULL,
+    `epochs` INT NOT NULL,
+    `val_loss` DOUBLE NOT NULL,
+    `pruned` BOOL NOT NULL  DEFAULT 0,
+    `created_at` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `asset_id` INT NOT NULL,
+    `model_type_id` INT NOT NULL,
+    `trained_model_id` INT,
+    CONSTRAINT `fk_hyperpar_asset_61f0b2d4` FOREIGN KEY (`asset_id`) REFERENCES `asset` (`id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_hyperpar_modeltyp_9c3e5a17` FOREIGN KEY (`model_type_id`) REFERENCES `modeltype` (`id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_hyperpar_trainedm_d28a4f60` FOREIGN KEY (`trained_model_id`) REFERENCES `trainedmodel` (`id`) ON DELETE SET NULL,
+    KEY `idx_hyperparame_search__a7d3e1` (`search_id`)
+) CHARACTER SET utf8mb4;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS `hyperparametertrial`;"""
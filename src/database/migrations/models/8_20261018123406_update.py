@@ -0,0 +1,25 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `trainedmodel` MODIFY COLUMN `serialized_model` LONGBLOB;
+        ALTER TABLE `trainedmodel` ADD `artifact_key` VARCHAR(64);
+        ALTER TABLE `trainedmodel` ADD `artifact_size` BIGINT;
+        ALTER TABLE `trainedmodel` ADD INDEX `idx_trainedmode_artifac_2f8c9d` (`artifact_key`);
+        ALTER TABLE `tempmodel` MODIFY COLUMN `serialized_model` LONGBLOB;
+        ALTER TABLE `tempmodel` ADD `artifact_key` VARCHAR(64);
+        ALTER TABLE `tempmodel` ADD `artifact_size` BIGINT;
+        ALTER TABLE `tempmodel` ADD INDEX `idx_tempmodel_artifac_7e41b3` (`artifact_key`);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `tempmodel` DROP INDEX `idx_tempmodel_artifac_7e41b3`;
+        ALTER TABLE `tempmodel` DROP COLUMN `artifact_size`;
+        ALTER TABLE `tempmodel` DROP COLUMN `artifact_key`;
+        ALTER TABLE `tempmodel` MODIFY COLUMN `serialized_model` LONGBLOB NOT NULL;
+        ALTER TABLE `trainedmodel` DROP INDEX `idx_trainedmode_artifac_2f8c9d`;
+        ALTER TABLE `trainedmodel` DROP COLUMN `artifact_size`;
+        ALTER TABLE `trainedmodel` DROP COLUMN `artifact_key`;
+        ALTER TABLE `trainedmodel` MODIFY COLUMN `serialized_model` LONGBLOB NOT NULL;"""
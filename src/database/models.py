@@ -48,9 +48,14 @@ class TrainedModel(Model):
     performance_metrics = fields.JSONField()
     hyperparameters = fields.JSONField()
     model_architecture = fields.JSONField()
-    serialized_model = fields.BinaryField()
+    # Legacy inline blob, superseded by the artifact store reference below
+    serialized_model = fields.BinaryField(null=True)
+    artifact_key = fields.CharField(max_length=64, null=True, index=True)
+    artifact_size = fields.BigIntField(null=True)
     training_performance = fields.JSONField()
     status = fields.CharField(max_length=25, default="Inactive")
+    fingerprint = fields.CharField(max_length=64, null=True, index=True)
+    normalization = fields.JSONField(null=True)
 
     def __str__(self):
         return self.model_name
@@ -68,7 +73,10 @@ class TempModel(Model):
     performance_metrics = fields.JSONField()
     hyperparameters = fields.JSONField()
     model_architecture = fields.JSONField()
-    serialized_model = fields.BinaryField()
+    # Legacy inline blob, superseded by the artifact store reference below
+    serialized_model = fields.BinaryField(null=True)
+    artifact_key = fields.CharField(max_length=64, null=True, index=True)
+    artifact_size = fields.BigIntField(null=True)
     training_performance = fields.JSONField()
     status = fields.CharField(max_length=25, default="Temporal")
 
@@ -83,14 +91,99 @@ class Queue(Model):
     model_type = fields.ForeignKeyField("models.ModelType", on_delete=fields.CASCADE)
     created_at = fields.DatetimeField(auto_now_add=True)
     priority = fields.BooleanField(default=False)
+    status = fields.CharField(max_length=20, default="pending")
+    claimed_by = fields.CharField(max_length=100, null=True)
+    lease_expires_at = fields.DatetimeField(null=True)
+    fingerprint = fields.CharField(max_length=64, null=True, unique=True)
 
     class Meta:
         ordering = ["priority", "created_at"]
+        indexes = (("status", "priority", "created_at"),)
 
     def __str__(self):
         return f"{self.user.email} - {self.asset.name} - {self.model_type.model_name}"
 
 
+class RequestSubscription(Model):
+    id = fields.IntField(pk=True)
+    user = fields.ForeignKeyField("models.User", on_delete=fields.CASCADE)
+    queue = fields.ForeignKeyField("models.Queue", null=True, on_delete=fields.SET_NULL)
+    trained_model = fields.ForeignKeyField(
+        "models.TrainedModel", null=True, on_delete=fields.SET_NULL
+    )
+    fingerprint = fields.CharField(max_length=64, index=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    status = fields.CharField(max_length=25, default="queued")
+    # Kafka message key (or topic:partition:offset) or API idempotency key
+    request_key = fields.CharField(max_length=128, null=True, unique=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.fingerprint} - {self.status}"
+
+
+class HyperparameterTrial(Model):
+    id = fields.IntField(pk=True)
+    search_id = fields.CharField(max_length=36, index=True)
+    asset = fields.ForeignKeyField("models.Asset", on_delete=fields.CASCADE)
+    model_type = fields.ForeignKeyField("models.ModelType", on_delete=fields.CASCADE)
+    trained_model = fields.ForeignKeyField(
+        "models.TrainedModel", null=True, on_delete=fields.SET_NULL
+    )
+    hyperparameters = fields.JSONField()
+    rung = fields.IntField()
+    epochs = fields.IntField()
+    val_loss = fields.FloatField()
+    pruned = fields.BooleanField(default=False)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["search_id", "rung", "val_loss"]
+
+    def __str__(self):
+        return f"{self.search_id} - rung {self.rung} - {self.val_loss}"
+
+
+class JobTiming(Model):
+    id = fields.IntField(pk=True)
+    # Plain id, the Queue row is deleted once the job finishes
+    queue_id = fields.IntField(null=True)
+    asset = fields.ForeignKeyField("models.Asset", on_delete=fields.CASCADE)
+    model_type = fields.ForeignKeyField("models.ModelType", on_delete=fields.CASCADE)
+    bars = fields.IntField()
+    features = fields.IntField()
+    input_width = fields.IntField()
+    hyperparameters = fields.JSONField()
+    epochs = fields.IntField(null=True)
+    warm_started = fields.BooleanField(default=False)
+    searched = fields.BooleanField(default=False)
+    fit_seconds = fields.FloatField()
+    created_at = fields.DatetimeField(auto_now_add=True, index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.model_type_id} - {self.asset_id} - {self.fit_seconds:.1f}s"
+
+
+class Forecast(Model):
+    id = fields.IntField(pk=True)
+    trained_model = fields.OneToOneField(
+        "models.TrainedModel", related_name="forecast", on_delete=fields.CASCADE
+    )
+    asset = fields.ForeignKeyField("models.Asset", on_delete=fields.CASCADE)
+    horizon = fields.IntField()
+    last_bar_date = fields.CharField(max_length=10)
+    values = fields.JSONField()
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.trained_model_id} - {self.last_bar_date}"
+
+
 class FailedQueue(Model):
     id = fields.IntField(pk=True)
     user = fields.ForeignKeyField("models.User", on_delete=fields.CASCADE)
@@ -1,12 +1,30 @@
+import signal
+
 from utils.logger import make_log
+from utils.singleton import Singleton
 from kafka.services import KafkaProducerSingleton
 
-kafka_producer = KafkaProducerSingleton()
-
 
 def signal_handler(signum, frame):
     make_log("KAFKA", 20, "workflow.log", f"Signal received: {signum}")
-    make_log("KAKFA", 20, "workflow.log", "Gracefully shutting down kafka producer...")
+    make_log("KAFKA", 20, "workflow.log", "Gracefully shutting down kafka producer...")
+
+    # Only an existing producer can hold buffered messages
+    kafka_producer = Singleton._instances.get(KafkaProducerSingleton)
+    if kafka_producer is not None:
+        undelivered = kafka_producer.flush()
+        kafka_producer.close()
+        if undelivered:
+            make_log(
+                "KAFKA",
+                40,
+                "workflow.log",
+                f"{undelivered} messages were not delivered before shutdown",
+            )
+    raise SystemExit(0)
+
 
-    kafka_producer.flush()
-    kafka_producer.close()
+def register_signal_handlers() -> None:
+    """Flushes buffered events before the process stops on SIGTERM or SIGINT"""
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal_handler)
@@ -0,0 +1,82 @@
+import json
+import struct
+from dataclasses import asdict, dataclass
+from typing import Dict, Type, Union
+
+# Binary messages start with MAGIC, which no JSON document can start with,
+# followed by the schema id of the fixed layout below
+MAGIC = 0xA7
+HEADER = struct.Struct(">BB")
+
+
+@dataclass
+class KafkaQueueMessage:
+    user_id: int
+    asset_id: int
+    model_type_id: int
+
+
+@dataclass
+class ModelTrainedEvent:
+    trained_model_id: int
+    user_id: int
+    asset_id: int
+    model_type_id: int
+    trained_at: int  # Unix time in milliseconds
+    ticker: str
+    artifact_key: str
+    artifact_size: int
+    val_loss: float
+    val_mae: float
+    test_loss: float
+    test_mae: float
+
+
+Event = Union[KafkaQueueMessage, ModelTrainedEvent]
+
+# Schema id -> (message class, big-endian body layout). Ids are never reused;
+# a changed layout gets a new id so old messages stay readable.
+SCHEMAS: Dict[int, tuple] = {
+    1: (KafkaQueueMessage, struct.Struct(">III")),
+    2: (ModelTrainedEvent, struct.Struct(">IIIIQ20s64sQdddd")),
+}
+SCHEMA_IDS: Dict[Type, int] = {cls: schema_id for schema_id, (cls, _) in SCHEMAS.items()}
+
+
+def encode(message: Event) -> bytes:
+    schema_id = SCHEMA_IDS[type(message)]
+    _, body = SCHEMAS[schema_id]
+    values = [
+        value.encode("utf-8") if isinstance(value, str) else value
+        for value in asdict(message).values()
+    ]
+    return HEADER.pack(MAGIC, schema_id) + body.pack(*values)
+
+
+def encode_json(message: Event) -> bytes:
+    return json.dumps(asdict(message)).encode("utf-8")
+
+
+def decode(payload: bytes, json_type: Type = KafkaQueueMessage) -> Event:
+    """Decodes a binary message, or a legacy JSON one as json_type
+
+    Raises:
+        ValueError: Unknown schema id, truncated body or invalid JSON
+        TypeError: JSON fields do not match json_type
+    """
+    if payload[:1] != bytes([MAGIC]):
+        return json_type(**json.loads(payload.decode("utf-8")))
+
+    _, schema_id = HEADER.unpack_from(payload)
+    if schema_id not in SCHEMAS:
+        raise ValueError(f"Unknown message schema {schema_id}")
+    cls, body = SCHEMAS[schema_id]
+    if len(payload) != HEADER.size + body.size:
+        raise ValueError(
+            f"Schema {schema_id} expects {HEADER.size + body.size} bytes, got {len(payload)}")
+    values = [
+        # Fixed-size strings come back NUL padded
+        value.rstrip(b"\0").decode("utf-8") if isinstance(value, bytes) else value
+        for value in body.unpack_from(payload, HEADER.size)
+    ]
+    return cls(*values)
@@ -1,88 +1,499 @@
-import os
+import asyncio
 import json
-from confluent_kafka import Consumer, KafkaError, KafkaException
-from dataclasses import dataclass
+import os
+import threading
+import time
+from collections import Counter
+from confluent_kafka import (
+    Consumer,
+    KafkaError,
+    KafkaException,
+    Message,
+    Producer,
+    TopicPartition,
+)
+from tortoise.exceptions import IntegrityError, ValidationError
+from typing import Dict, List, Optional, Set, Tuple
 
 from utils.logger import make_log
-from database.models import User
-from database.models import Queue
+from utils.singleton import Singleton
+from database.models import Asset, User, ModelType, Queue
+from kafka.schemas import (
+    KafkaQueueMessage,
+    ModelTrainedEvent,
+    decode,
+    encode,
+    encode_json,
+)
+from model_core.queue_lease import claimable
+from model_core import request_coalescing, cost_model
+
 
+TOPIC = os.getenv("MODEL_QUEUE_TRAIN_TOPIC")
+BATCH_SIZE = int(os.getenv("KAFKA_CONSUMER_BATCH_SIZE", "500"))
+BATCH_TIMEOUT = float(os.getenv("KAFKA_CONSUMER_BATCH_TIMEOUT", "1.0"))
+# Backpressure: pause consumption above the high marks, resume below the low marks
+QUEUE_DEPTH_HIGH = int(os.getenv("KAFKA_QUEUE_DEPTH_HIGH", "5000"))
+QUEUE_DEPTH_LOW = int(os.getenv("KAFKA_QUEUE_DEPTH_LOW", "4000"))
+BACKLOG_HIGH_SECONDS = float(os.getenv("KAFKA_BACKLOG_HIGH_SECONDS", "0"))  # 0 disables
+BACKLOG_LOW_SECONDS = float(os.getenv("KAFKA_BACKLOG_LOW_SECONDS", "0"))
+BACKPRESSURE_CHECK_SECONDS = float(os.getenv("KAFKA_BACKPRESSURE_CHECK_SECONDS", "5"))
+PARTITION_BUFFER = int(os.getenv("KAFKA_PARTITION_BUFFER", str(4 * BATCH_SIZE)))
 
-@dataclass
-class KafkaQueueMessage:
-    user_id: int
-    asset_id: int
-    model_type_id: int
+DEAD_LETTER_TOPIC = os.getenv("MODEL_QUEUE_DEAD_LETTER_TOPIC")
+DEAD_LETTER_FLUSH_SECONDS = 10.0
+ENQUEUE_RETRIES = int(os.getenv("KAFKA_ENQUEUE_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = 0.5
+# Errors caused by the message content rather than by the database being unavailable
+DATA_ERRORS = (IntegrityError, ValidationError, ValueError, TypeError)
 
+MODEL_TRAINED_TOPIC = os.getenv("MODEL_TRAINED_TOPIC")
+EVENT_ENCODING = os.getenv("KAFKA_EVENT_ENCODING", "binary")  # or "json"
+PRODUCER_LINGER_MS = int(os.getenv("KAFKA_PRODUCER_LINGER_MS", "50"))
+PRODUCER_BATCH_MESSAGES = int(os.getenv("KAFKA_PRODUCER_BATCH_MESSAGES", "10000"))
+PRODUCER_COMPRESSION = os.getenv("KAFKA_PRODUCER_COMPRESSION", "zstd")
+PRODUCER_FLUSH_SECONDS = 10.0
+
+PartitionKey = Tuple[str, int]
+Rejected = Tuple[Message, str]
 
-TOPIC = os.getenv("MODEL_QUEUE_TRAIN_TOPIC")
 
-def get_consumer():
+def get_consumer(on_revoke=None, on_assign=None):
     consumer = Consumer(
         {
             "bootstrap.servers": os.getenv("KAFKA_BOOTSTRAP_SERVER"),
             "group.id": os.getenv("KAFKA_GROUP_ID"),
             "auto.offset.reset": "earliest",
+            # Offsets are committed once the batch is in the database
+            "enable.auto.commit": False,
         }
     )
 
-    consumer.subscribe(os.getenv("MODEL_QUEUE_TRAIN_TOPIC"))
+    callbacks = {}
+    if on_revoke is not None:
+        callbacks["on_revoke"] = on_revoke
+    if on_assign is not None:
+        callbacks["on_assign"] = on_assign
+    consumer.subscribe([TOPIC], **callbacks)
     return consumer
 
 
-async def queue_consumer_loop():
+def message_key(msg: Message) -> str:
+    """Idempotency key of a request: its Kafka key, else its position in the log"""
+    key = msg.key()
+    if key:
+        return key.decode("utf-8", errors="replace")[:128]
+    return f"{msg.topic()}:{msg.partition()}:{msg.offset()}"
+
+
+def decode_messages(
+    messages: List[Message],
+) -> Tuple[List[Tuple[Message, KafkaQueueMessage]], List[Rejected]]:
+    """Decodes a consumed batch, setting aside the messages that cannot be decoded
+
+    Returns:
+        Tuple: (message, request) pairs and (message, error) pairs for the dead-letter topic
+
+    Raises:
+        KafkaException: A message carries a fatal consumer error
+    """
+    decoded, rejected = [], []
+    for msg in messages:
+        if msg.error():
+            if msg.error().code() == KafkaError._PARTITION_EOF:
+                continue
+            raise KafkaException(msg.error())
+        try:
+            message = decode(msg.value())
+        except (ValueError, TypeError) as e:
+            rejected.append((msg, f"Error decoding request data: {str(e)}"))
+            continue
+        if not isinstance(message, KafkaQueueMessage):
+            rejected.append(
+                (msg, f"{type(message).__name__} on the training request topic"))
+            continue
+        decoded.append((msg, message))
+    return decoded, rejected
+
+
+async def enqueue_messages(
+    decoded: List[Tuple[Message, KafkaQueueMessage]],
+) -> Tuple[Dict[str, int], List[Rejected]]:
+    """Enqueues a decoded batch, resolving users, assets and model types with one query each
+
+    Returns:
+        Tuple: Number of requests per coalescing outcome, and the rejected messages
+    """
+    messages = [message for _, message in decoded]
+    priorities = dict(
+        await User.filter(id__in={m.user_id for m in messages}).values_list(
+            "id", "priority")
+    )
+    model_types = {
+        model_type.id: model_type
+        for model_type in await ModelType.filter(
+            id__in={m.model_type_id for m in messages})
+    }
+    assets = set(
+        await Asset.filter(id__in={m.asset_id for m in messages}).values_list(
+            "id", flat=True)
+    )
+
+    requests, rejected = [], []
+    for msg, message in decoded:
+        if (
+            message.user_id not in priorities
+            or message.asset_id not in assets
+            or message.model_type_id not in model_types
+        ):
+            rejected.append(
+                (msg, f"Unknown user, asset or model type in request: {message}"))
+            continue
+        requests.append(
+            request_coalescing.EnqueueRequest(
+                user_id=message.user_id,
+                asset_id=message.asset_id,
+                model_type=model_types[message.model_type_id],
+                priority=priorities[message.user_id],
+                request_key=message_key(msg),
+            )
+        )
+    results = await request_coalescing.enqueue_requests(requests)
+    return dict(Counter(outcome for outcome, _ in results)), rejected
+
+
+async def enqueue_with_retries(
+    decoded: List[Tuple[Message, KafkaQueueMessage]],
+) -> List[Rejected]:
+    """Enqueues a batch, isolating the messages the database rejects
+
+    Transient database errors are retried with backoff; a batch rejected for its
+    data is retried one message at a time so only the offending ones are rejected.
+
+    Returns:
+        List[Rejected]: Messages to send to the dead-letter topic
+
+    Raises:
+        Exception: The database kept failing after ENQUEUE_RETRIES attempts
+    """
+    for attempt in range(ENQUEUE_RETRIES):
+        try:
+            _, rejected = await enqueue_messages(decoded)
+            return rejected
+        except DATA_ERRORS:
+            break
+        except Exception as e:
+            if attempt == ENQUEUE_RETRIES - 1:
+                raise
+            make_log(
+                "KAFKA_DB",
+                30,
+                "models_workflow.log",
+                f"Error creating Queue objects, retrying: {str(e)}",
+            )
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    rejected = []
+    for item in decoded:
+        try:
+            rejected += (await enqueue_messages([item]))[1]
+        except DATA_ERRORS as e:
+            rejected.append((item[0], f"{type(e).__name__}: {str(e)}"))
+    return rejected
+
+
+class DeadLetterQueue:
+    """Forwards rejected messages, untouched, to DEAD_LETTER_TOPIC with the error
+    and their original position in headers. Without a topic they are only logged."""
+
+    def __init__(self, topic: Optional[str] = DEAD_LETTER_TOPIC, producer=None):
+        self.topic = topic
+        self.producer = producer
+        if topic and producer is None:
+            self.producer = Producer(
+                {
+                    "bootstrap.servers": os.getenv("KAFKA_BOOTSTRAP_SERVER"),
+                    "enable.idempotence": True,
+                }
+            )
+
+    async def send(self, rejected: List[Rejected]) -> bool:
+        """Returns False if some messages could not be delivered to the topic"""
+        for msg, error in rejected:
+            make_log(
+                "KAFKA_CONSUMER",
+                40,
+                "models_workflow.log",
+                f"Rejected message {message_key(msg)}: {error}",
+            )
+        if not rejected or not self.topic:
+            return True
+
+        for msg, error in rejected:
+            self.producer.produce(
+                self.topic,
+                key=msg.key(),
+                value=msg.value(),
+                headers={
+                    "error": error,
+                    "source_topic": msg.topic(),
+                    "source_partition": str(msg.partition()),
+                    "source_offset": str(msg.offset()),
+                },
+            )
+        remaining = await asyncio.get_running_loop().run_in_executor(
+            None, self.producer.flush, DEAD_LETTER_FLUSH_SECONDS
+        )
+        return remaining == 0
+
+
+async def process_batch(
+    consumer, messages: List[Message], dead_letters: DeadLetterQueue
+) -> bool:
+    """Enqueues one consumed batch and commits its offsets once it is stored and its
+    rejected messages are dead-lettered
+
+    Returns:
+        bool: False if the batch was not committed and has to be replayed
+
+    Raises:
+        KafkaException: A message carries a fatal consumer error
+    """
+    decoded, rejected = decode_messages(messages)
     try:
-        with get_consumer() as consumer:
-            while True:
-                msg = consumer.poll()
-                if msg is None:
+        rejected += await enqueue_with_retries(decoded)
+    except Exception as e:
+        make_log(
+            "KAFKA_DB",
+            40,
+            "models_workflow.log",
+            f"Error creating Queue objects: {str(e)}",
+        )
+        return False
+    if not await dead_letters.send(rejected):
+        make_log(
+            "KAFKA_CONSUMER",
+            40,
+            "models_workflow.log",
+            "Dead-letter topic unavailable, batch will be replayed",
+        )
+        return False
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: consumer.commit(offsets=next_offsets(messages), asynchronous=False),
+        )
+    except KafkaException as ke:
+        # Typically a partition revoked by a rebalance; its new owner replays the
+        # batch, which the request keys make free
+        make_log(
+            "KAFKA_CONSUMER",
+            30,
+            "models_workflow.log",
+            f"Could not commit offsets: {str(ke.args[0])}",
+        )
+    return True
+
+
+def next_offsets(messages: List[Message]) -> List[TopicPartition]:
+    """Offsets to commit after messages, i.e. one past the last offset per partition"""
+    offsets: Dict[PartitionKey, int] = {}
+    for msg in messages:
+        key = (msg.topic(), msg.partition())
+        offsets[key] = max(offsets.get(key, -1), msg.offset() + 1)
+    return [
+        TopicPartition(topic, partition, offset)
+        for (topic, partition), offset in offsets.items()
+    ]
+
+
+class QueueConsumer:
+    """Consumes training requests with one async worker per partition.
+
+    A single consume() call in the default executor feeds per-partition buffers;
+    each partition worker drains its buffer in order, enqueues it in batches and
+    commits that partition's offsets once the rows are stored, so one slow batch
+    never holds back the other partitions and per-partition ordering is kept.
+
+    Two kinds of backpressure pause partitions on the consumer: a partition whose
+    buffer exceeds partition_buffer is paused until its worker catches up, and all
+    partitions are paused while the claimable Queue depth (or, when enabled, the
+    estimated training backlog) is above its high mark, until it drops below the
+    low mark.
+    """
+
+    def __init__(
+        self,
+        consumer=None,
+        batch_size: int = BATCH_SIZE,
+        dead_letters: Optional[DeadLetterQueue] = None,
+    ):
+        self.consumer = consumer or get_consumer(
+            on_revoke=self._on_revoke, on_assign=self._on_assign)
+        self.batch_size = batch_size
+        self.dead_letters = dead_letters or DeadLetterQueue()
+        self._loop = None
+        self._buffers: Dict[PartitionKey, asyncio.Queue] = {}
+        self._workers: Dict[PartitionKey, asyncio.Task] = {}
+        self._buffer_paused: Set[PartitionKey] = set()
+        # Next offset to dispatch per partition, and where a rewound partition's
+        # messages fetched before the seek start
+        self._fetched: Dict[PartitionKey, int] = {}
+        self._stale_from: Dict[PartitionKey, int] = {}
+        self.throttled = False
+        self._checked_at = 0.0
+
+    def _pause(self, keys) -> None:
+        self.consumer.pause([TopicPartition(topic, partition) for topic, partition in keys])
+
+    def _resume(self, keys) -> None:
+        self.consumer.resume([TopicPartition(topic, partition) for topic, partition in keys])
+
+    def _assigned(self) -> List[PartitionKey]:
+        return [(tp.topic, tp.partition) for tp in self.consumer.assignment()]
+
+    def _on_assign(self, consumer, partitions: List[TopicPartition]) -> None:
+        # Runs inside consume(), on the executor thread. Partitions gained in a
+        # rebalance start resumed, so they are paused here while throttled
+        if self.throttled:
+            consumer.assign(partitions)
+            consumer.pause(partitions)
+
+    def _on_revoke(self, consumer, partitions: List[TopicPartition]) -> None:
+        # Runs inside consume(), on the executor thread
+        keys = [(tp.topic, tp.partition) for tp in partitions]
+        self._loop.call_soon_threadsafe(self._drop_partitions, keys)
+
+    def _drop_partitions(self, keys: List[PartitionKey]) -> None:
+        """Forgets revoked partitions; their uncommitted messages go to the new owner"""
+        for key in keys:
+            worker = self._workers.pop(key, None)
+            if worker is not None:
+                worker.cancel()
+            self._buffers.pop(key, None)
+            self._buffer_paused.discard(key)
+            self._fetched.pop(key, None)
+            self._stale_from.pop(key, None)
+
+    async def _partition_worker(self, key: PartitionKey, buffer: asyncio.Queue) -> None:
+        while True:
+            batch = [await buffer.get()]
+            while len(batch) < self.batch_size and not buffer.empty():
+                batch.append(buffer.get_nowait())
+            if not await process_batch(self.consumer, batch, self.dead_letters):
+                self._rewind(key, buffer, batch[0].offset())
+                continue
+            if key in self._buffer_paused and buffer.qsize() <= PARTITION_BUFFER // 2:
+                self._buffer_paused.discard(key)
+                if not self.throttled:
+                    self._resume([key])
+
+    def _rewind(self, key: PartitionKey, buffer: asyncio.Queue, offset: int) -> None:
+        """Drops the partition's buffered messages and consumes it again from offset,
+        so nothing after an uncommitted batch gets committed before it. Messages a
+        consume() already running fetched before the seek are dropped by _dispatch"""
+        while not buffer.empty():
+            buffer.get_nowait()
+        fetched = self._fetched.get(key)
+        if fetched is not None and fetched > offset:
+            self._stale_from[key] = fetched
+        self._fetched[key] = offset
+        self.consumer.seek(TopicPartition(key[0], key[1], offset))
+
+    def _dispatch(self, messages: List[Message]) -> None:
+        """Routes consumed messages to their partition's buffer
+
+        Raises:
+            KafkaException: A message carries a fatal consumer error
+        """
+        for msg in messages:
+            if msg.error():
+                if msg.error().code() == KafkaError._PARTITION_EOF:
                     continue
-                if msg.error():
-                    if msg.error().code() == KafkaError._PARTITION_EOF:
-                        continue
-                    make_log(
-                        "KAFKA_CONSUMER",
-                        40,
-                        "models_workflow.log",
-                        f"Kafka consumer error: {msg.error()}",
-                    )
-                    break
-
-                try:
-                    data = KafkaQueueMessage(
-                        **json.loads(msg.value().decode("utf-8")))
-                except json.JSONDecodeError:
-                    make_log(
-                        "KAFKA_CONSUMER",
-                        40,
-                        "models_workflow.log",
-                        "Error decoding JSON request data",
-                    )
+                raise KafkaException(msg.error())
+            key = (msg.topic(), msg.partition())
+            stale_from = self._stale_from.get(key)
+            if stale_from is not None:
+                if msg.offset() >= stale_from:
+                    # Fetched before a rewind, it comes again after the rewound ones
                     continue
+                del self._stale_from[key]
+            self._fetched[key] = msg.offset() + 1
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = asyncio.Queue()
+                self._workers[key] = asyncio.create_task(
+                    self._partition_worker(key, buffer)
+                )
+            buffer.put_nowait(msg)
+            if buffer.qsize() > PARTITION_BUFFER and key not in self._buffer_paused:
+                self._buffer_paused.add(key)
+                self._pause([key])
 
-                user_id = data.user_id
-                asset_id = data.asset_id
-                model_type_id = data.model_type_id
-
-                priority = await User.get(id=user_id).priority
-
-                try:
-                    await Queue(
-                        user=user_id,
-                        asset_id=asset_id,
-                        model_type_id=model_type_id,
-                        priority=priority,
-                    ).save()
-                except Exception as e:
-                    make_log(
-                        "KAFKA_DB",
-                        40,
-                        "models_workflow.log",
-                        f"Error creating Queue object: {str(e)}",
-                    )
-                    continue
+    async def _apply_backpressure(self) -> None:
+        if time.monotonic() - self._checked_at < BACKPRESSURE_CHECK_SECONDS:
+            return
+        self._checked_at = time.monotonic()
+        if BACKLOG_HIGH_SECONDS:
+            backlog = await cost_model.capacity()
+            depth, backlog_seconds = backlog["pending"], backlog["backlog_seconds"]
+        else:
+            depth, backlog_seconds = await Queue.filter(claimable()).count(), 0.0
 
-                consumer.commit(msg)
+        if not self.throttled and (
+            depth > QUEUE_DEPTH_HIGH
+            or (BACKLOG_HIGH_SECONDS and backlog_seconds > BACKLOG_HIGH_SECONDS)
+        ):
+            self.throttled = True
+            self._pause(self._assigned())
+            make_log(
+                "KAFKA_CONSUMER",
+                30,
+                "models_workflow.log",
+                f"Queue depth {depth} (backlog {backlog_seconds:.0f}s) too high, pausing consumption",
+            )
+        elif self.throttled and depth < QUEUE_DEPTH_LOW and (
+            not BACKLOG_HIGH_SECONDS or backlog_seconds < BACKLOG_LOW_SECONDS
+        ):
+            self.throttled = False
+            self._resume(
+                [key for key in self._assigned() if key not in self._buffer_paused]
+            )
+            make_log(
+                "KAFKA_CONSUMER",
+                20,
+                "models_workflow.log",
+                f"Queue depth {depth} back under {QUEUE_DEPTH_LOW}, resuming consumption",
+            )
+        elif self.throttled:
+            # Again on every check, in case a rebalance assigned partitions since
+            self._pause(self._assigned())
+
+    async def run(self) -> None:
+        loop = self._loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await self._apply_backpressure()
+                # Keeps polling while paused so the group membership stays alive
+                messages = await loop.run_in_executor(
+                    None, self.consumer.consume, self.batch_size, BATCH_TIMEOUT
+                )
+                if messages:
+                    self._dispatch(messages)
+        finally:
+            for worker in self._workers.values():
+                worker.cancel()
+            self.consumer.close()
+
+
+async def queue_consumer_loop(consumer=None):
+    """Consumes training requests until the consumer fails
+
+    Args:
+        consumer (optional): Consumer to read from. Defaults to get_consumer().
+    """
+    try:
+        await QueueConsumer(consumer).run()
     except (
         KafkaException
     ) as ke:  # Propagate this error to the caller whenever I implement it
@@ -90,7 +501,7 @@ async def queue_consumer_loop():
             "KAFKA_CONSUMER",
             40,
             "models_workflow.log",
-            f"Error getting Kafka consumer: {str(ke.args[0])}",
+            f"Kafka consumer error: {str(ke.args[0])}",
         )
 
 
@@ -103,9 +514,104 @@ def delivery_callback(err, msg):
             f"ERROR: Message delivery failed: {err}",
         )
     else:
+        # Values may be binary, so only their size is logged
+        key = msg.key().decode("utf-8") if msg.key() else None
         make_log(
             "KAFKA_MODEL",
             20,
             "kafka_workflow.log",
-            f"Produced event to topic {msg.topic()}, key = {msg.key().decode('utf-8')}, value = {msg.value().decode('utf-8')}",
+            f"Produced event to topic {msg.topic()}, key = {key}, {len(msg.value())} bytes",
         )
+
+
+class KafkaProducerSingleton(metaclass=Singleton):
+    """Process-wide producer for outgoing events.
+
+    Messages are batched for PRODUCER_LINGER_MS and compressed per batch; produce()
+    only enqueues them in librdkafka's buffer, and a background thread serves the
+    delivery callbacks. flush() must run before the process exits, see
+    kafka.management.commands.signal.
+    """
+
+    def __init__(self):
+        self.producer = Producer(
+            {
+                "bootstrap.servers": os.getenv("KAFKA_BOOTSTRAP_SERVER"),
+                "linger.ms": PRODUCER_LINGER_MS,
+                "batch.num.messages": PRODUCER_BATCH_MESSAGES,
+                "compression.type": PRODUCER_COMPRESSION,
+                "enable.idempotence": True,
+            }
+        )
+        self._closed = threading.Event()
+        self._poller = threading.Thread(
+            target=self._serve_callbacks, name="kafka-producer", daemon=True
+        )
+        self._poller.start()
+
+    def _serve_callbacks(self) -> None:
+        while not self._closed.is_set():
+            self.producer.poll(0.5)
+
+    def produce(self, topic: str, value: bytes, key: Optional[str] = None) -> None:
+        try:
+            self.producer.produce(
+                topic, key=key, value=value, on_delivery=delivery_callback
+            )
+        except BufferError:
+            # Local queue full: wait for in-flight batches to drain, then retry once
+            self.producer.poll(1.0)
+            self.producer.produce(
+                topic, key=key, value=value, on_delivery=delivery_callback
+            )
+
+    def flush(self, timeout: float = PRODUCER_FLUSH_SECONDS) -> int:
+        """Waits for buffered messages to be delivered
+
+        Returns:
+            int: Messages still undelivered after timeout
+        """
+        return self.producer.flush(timeout)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._poller.join()
+
+
+def model_trained_event(trained_model, ticker: str) -> ModelTrainedEvent:
+    val_loss, val_mae = _loss_and_mae(trained_model.training_performance)
+    test_loss, test_mae = _loss_and_mae(trained_model.performance_metrics)
+    return ModelTrainedEvent(
+        trained_model_id=trained_model.id,
+        user_id=trained_model.user_id or 0,
+        asset_id=trained_model.asset_id,
+        model_type_id=trained_model.model_type_id,
+        trained_at=int(trained_model.training_timestamp.timestamp() * 1000),
+        ticker=ticker,
+        artifact_key=trained_model.artifact_key or "",
+        artifact_size=trained_model.artifact_size or 0,
+        val_loss=val_loss,
+        val_mae=val_mae,
+        test_loss=test_loss,
+        test_mae=test_mae,
+    )
+
+
+def _loss_and_mae(metrics) -> Tuple[float, float]:
+    """Evaluation results are stored as the JSON of [loss, mae]"""
+    if isinstance(metrics, str):
+        metrics = json.loads(metrics)
+    if not isinstance(metrics, list):
+        metrics = [metrics]
+    metrics = [float(value) for value in metrics] + [float("nan")] * 2
+    return metrics[0], metrics[1]
+
+
+def publish_model_trained(trained_model, ticker: str) -> None:
+    """Notifies MODEL_TRAINED_TOPIC that a model is ready, keyed by ticker so the
+    events of an asset stay ordered. Does nothing if the topic is not configured."""
+    if not MODEL_TRAINED_TOPIC:
+        return
+    event = model_trained_event(trained_model, ticker)
+    payload = encode(event) if EVENT_ENCODING == "binary" else encode_json(event)
+    KafkaProducerSingleton().produce(MODEL_TRAINED_TOPIC, payload, key=ticker)
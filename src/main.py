@@ -3,10 +3,11 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 from tortoise.contrib.fastapi import register_tortoise
 
-from api.main import api_router
-
+# Before the API imports, whose modules read their settings at import time
 load_dotenv()
 
+from api.main import api_router  # noqa: E402
+
 app = FastAPI(title="Typhoon")
 
 register_tortoise(
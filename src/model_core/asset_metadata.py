@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from utils.logger import make_log
+
+FETCH_CONCURRENCY = int(os.getenv("ASSET_METADATA_CONCURRENCY", "16"))
+LOCAL_METADATA_FILE = os.getenv("ASSET_METADATA_FILE", "asset_metadata.json")
+
+# Column widths of Asset
+NAME_LENGTH = 50
+SECTOR_LENGTH = 50
+ASSET_TYPE_LENGTH = 50
+
+Metadata = Dict[str, Optional[str]]
+
+
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if isinstance(value, str) else value
+
+
+class MetadataProvider(ABC):
+    """Looks up the name, type and sector of a ticker.
+
+    fetch() is blocking and is run in a thread pool by fetch_all, so providers can
+    wrap synchronous HTTP clients.
+    """
+
+    @abstractmethod
+    def fetch(self, ticker: str) -> Optional[Metadata]:
+        """Metadata of a ticker
+
+        Returns:
+            Optional[Metadata]: {"name", "asset_type", "sector"}, None if the ticker is unknown
+        """
+
+    @staticmethod
+    def metadata(name: Optional[str], asset_type: Optional[str], sector: Optional[str]
+                 ) -> Optional[Metadata]:
+        if name is None:
+            return None
+        return {
+            "name": _clip(name, NAME_LENGTH),
+            "asset_type": _clip(asset_type, ASSET_TYPE_LENGTH),
+            "sector": _clip(sector, SECTOR_LENGTH),
+        }
+
+
+class YFinanceProvider(MetadataProvider):
+    def fetch(self, ticker: str) -> Optional[Metadata]:
+        import yfinance as yf  # Only the API process needs it, and only here
+
+        data = yf.Ticker(ticker).info
+        return self.metadata(
+            data.get("shortName"), data.get("quoteType"), data.get("sector")
+        )
+
+
+class LocalProvider(MetadataProvider):
+    """Serves metadata from a dict or a JSON file of {ticker: {"shortName",
+    "quoteType", "sector"}}, for tests and offline setups"""
+
+    def __init__(self, data: Optional[Dict[str, Dict[str, str]]] = None,
+                 path: str = LOCAL_METADATA_FILE):
+        if data is None:
+            with open(path) as f:
+                data = json.load(f)
+        self.data = data
+
+    def fetch(self, ticker: str) -> Optional[Metadata]:
+        data = self.data.get(ticker, {})
+        return self.metadata(
+            data.get("shortName"), data.get("quoteType"), data.get("sector")
+        )
+
+
+PROVIDERS: Dict[str, type] = {
+    "yfinance": YFinanceProvider,
+    "local": LocalProvider,
+}
+
+
+def get_provider(name: str = os.getenv("ASSET_METADATA_PROVIDER", "yfinance"), **kwargs
+                 ) -> MetadataProvider:
+    return PROVIDERS[name](**kwargs)
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=FETCH_CONCURRENCY, thread_name_prefix="asset-metadata")
+
+
+async def fetch_all(
+    tickers: Iterable[str],
+    provider: MetadataProvider,
+    concurrency: int = FETCH_CONCURRENCY,
+) -> AsyncIterator[Tuple[str, Optional[Metadata]]]:
+    """Fetches metadata of many tickers concurrently, at most concurrency at a time
+
+    Yields:
+        Tuple[str, Optional[Metadata]]: (ticker, metadata) in completion order, with
+        None metadata for unknown tickers and failed lookups
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(ticker: str) -> Tuple[str, Optional[Metadata]]:
+        async with semaphore:
+            try:
+                return ticker, await loop.run_in_executor(
+                    _executor, provider.fetch, ticker
+                )
+            except Exception as e:
+                make_log(
+                    "ASSET_METADATA",
+                    40,
+                    "api_error.log",
+                    f"Error fetching data for {ticker}: {str(e)}",
+                )
+                return ticker, None
+
+    tasks = [asyncio.ensure_future(fetch(ticker)) for ticker in tickers]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # The client went away; lookups already running in threads finish on their own
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,245 @@
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from tortoise import timezone
+
+from database.models import JobTiming, ModelType, Queue
+from model_core.queue_lease import IN_PROGRESS, claimable
+from utils.logger import make_log
+
+HISTORY = int(os.getenv("COST_MODEL_HISTORY", "2000"))
+REFIT_SECONDS = int(os.getenv("COST_MODEL_REFIT_SECONDS", "300"))
+MIN_SAMPLES = int(os.getenv("COST_MODEL_MIN_SAMPLES", "5"))
+DEFAULT_SECONDS = float(os.getenv("COST_MODEL_DEFAULT_SECONDS", "120"))
+RIDGE = 1e-3
+# Same setting as hyperparameter_search.SEARCH, read here because importing that
+# module loads TensorFlow, which the Kafka consumer otherwise never needs
+SEARCH = os.getenv("HYPERPARAMETER_SEARCH", "0") == "1"
+
+# Shape of the window built by data_processing, used until an asset has been timed
+DEFAULT_BARS = 1250
+DEFAULT_FEATURES = 11
+DEFAULT_INPUT_WIDTH = 30
+
+
+@dataclass
+class JobShape:
+    bars: int
+    features: int
+    input_width: int
+    hyperparameters: Dict[str, Any]
+    warm_started: bool = False
+    searched: bool = False
+
+
+def _hyperparameter_size(hyperparameters: Dict[str, Any]) -> float:
+    """Product of the numeric hyperparameters, e.g. LSTM units"""
+    size = 1.0
+    for value in (hyperparameters or {}).values():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+            size *= value
+    return size
+
+
+def feature_vector(shape: JobShape) -> np.ndarray:
+    return np.array(
+        [
+            1.0,
+            math.log(max(shape.bars * shape.features, 1)),
+            math.log(max(shape.input_width, 1)),
+            math.log1p(_hyperparameter_size(shape.hyperparameters)),
+            float(shape.warm_started),
+            float(shape.searched),
+        ]
+    )
+
+
+def _fit(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Ridge keeps the solve stable while most jobs share the same shape
+    A = X.T @ X + RIDGE * np.eye(X.shape[1])
+    return np.linalg.solve(A, X.T @ y)
+
+
+class CostModel:
+    """Predicts the fit time of a training job from timings of past jobs.
+
+    Fits log(fit seconds) as a linear function of log(bars x features), log(window
+    width), log of the hyperparameter size and the warm start / search flags, one
+    fit per model type with a global fit as fallback. estimate() is synchronous so
+    schedulers can call it while ranking candidates; refresh() reloads the timings
+    and refits at most every refit_seconds.
+    """
+
+    def __init__(self, refit_seconds: int = REFIT_SECONDS):
+        self.refit_seconds = refit_seconds
+        self.fitted_at: Optional[float] = None
+        self.samples = 0
+        self._coefficients: Dict[Optional[int], np.ndarray] = {}
+        self._asset_shapes: Dict[int, Tuple[int, int, int]] = {}
+        self._hyperparameters: Dict[int, Dict[str, Any]] = {}
+
+    def fit(self, timings: List[JobTiming]) -> None:
+        by_type: Dict[Optional[int], List[JobTiming]] = {None: list(timings)}
+        for timing in timings:
+            by_type.setdefault(timing.model_type_id, []).append(timing)
+
+        self._coefficients = {}
+        for model_type_id, rows in by_type.items():
+            if len(rows) < MIN_SAMPLES:
+                continue
+            X = np.stack([feature_vector(self._shape_of(row)) for row in rows])
+            y = np.log([max(row.fit_seconds, 1e-3) for row in rows])
+            self._coefficients[model_type_id] = _fit(X, y)
+        self.samples = len(timings)
+
+    def _shape_of(self, timing: JobTiming) -> JobShape:
+        return JobShape(
+            bars=timing.bars,
+            features=timing.features,
+            input_width=timing.input_width,
+            hyperparameters=timing.hyperparameters,
+            warm_started=timing.warm_started,
+            searched=timing.searched,
+        )
+
+    def predict(self, model_type_id: Optional[int], shape: JobShape) -> float:
+        """Estimated fit time in seconds"""
+        coefficients = self._coefficients.get(model_type_id, self._coefficients.get(None))
+        if coefficients is None:
+            return DEFAULT_SECONDS
+        return float(math.exp(feature_vector(shape) @ coefficients))
+
+    def queue_shape(self, queue_item: Queue, searched: bool = False) -> JobShape:
+        bars, features, input_width = self._asset_shapes.get(
+            queue_item.asset_id, (DEFAULT_BARS, DEFAULT_FEATURES, DEFAULT_INPUT_WIDTH)
+        )
+        return JobShape(
+            bars=bars,
+            features=features,
+            input_width=input_width,
+            hyperparameters=self._hyperparameters.get(queue_item.model_type_id, {}),
+            searched=searched,
+        )
+
+    def estimate(self, queue_item: Queue) -> float:
+        return self.predict(
+            queue_item.model_type_id, self.queue_shape(queue_item, searched=SEARCH)
+        )
+
+    async def refresh(self, force: bool = False) -> None:
+        """Reloads recorded timings and refits when the last fit is older than refit_seconds"""
+        if (
+            not force
+            and self.fitted_at is not None
+            and time.monotonic() - self.fitted_at < self.refit_seconds
+        ):
+            return
+        timings = await JobTiming.all().order_by("-created_at").limit(HISTORY)
+        self.fit(timings)
+        # Newest timing per asset wins, since timings come newest first
+        self._asset_shapes = {}
+        for timing in timings:
+            self._asset_shapes.setdefault(
+                timing.asset_id, (timing.bars, timing.features, timing.input_width)
+            )
+        self._hyperparameters = {
+            model_type.id: model_type.default_hyperparameters or {}
+            for model_type in await ModelType.all()
+        }
+        self.fitted_at = time.monotonic()
+        make_log(
+            "COST_MODEL",
+            20,
+            "trainer_workflow.log",
+            f"Cost model fitted on {self.samples} timings",
+        )
+
+    async def record(
+        self,
+        queue_item: Queue,
+        window,
+        hyperparameters: Dict[str, Any],
+        fit_seconds: float,
+        epochs: Optional[int],
+        warm_started: bool,
+        searched: bool,
+    ) -> JobTiming:
+        """Stores the timing of a finished fit so later estimates can learn from it"""
+        return await JobTiming.create(
+            queue_id=queue_item.id,
+            asset_id=queue_item.asset_id,
+            model_type_id=queue_item.model_type_id,
+            bars=len(window.train_df) + len(window.val_df) + len(window.test_df),
+            features=len(window.column_indices),
+            input_width=window.input_width,
+            hyperparameters=hyperparameters,
+            epochs=epochs,
+            warm_started=warm_started,
+            searched=searched,
+            fit_seconds=fit_seconds,
+        )
+
+
+cost_model = CostModel()
+
+
+async def active_workers() -> int:
+    """Distinct workers currently holding a live lease, at least one"""
+    workers = (
+        await Queue.filter(status=IN_PROGRESS, lease_expires_at__gte=timezone.now())
+        .distinct()
+        .values_list("claimed_by", flat=True)
+    )
+    return max(len(set(workers)), 1)
+
+
+async def queue_eta(queue_id: int) -> Optional[Dict[str, Any]]:
+    """Position of a request in the queue and the estimated seconds until it finishes.
+
+    Position counts the claimable requests created before it; the ETA spreads their
+    estimated cost, plus its own, over the workers currently training.
+
+    Returns:
+        Optional[Dict[str, Any]]: None if the request is no longer queued
+    """
+    queue_item = await Queue.filter(id=queue_id).first()
+    if queue_item is None:
+        return None
+    await cost_model.refresh()
+    estimated_seconds = cost_model.estimate(queue_item)
+
+    if queue_item.status == IN_PROGRESS:
+        ahead: List[Queue] = []
+    else:
+        ahead = await Queue.filter(
+            claimable(), created_at__lt=queue_item.created_at
+        ).only("id", "asset_id", "model_type_id")
+    ahead_seconds = sum(cost_model.estimate(item) for item in ahead)
+    workers = await active_workers()
+    return {
+        "queue_id": queue_item.id,
+        "status": queue_item.status,
+        "position": len(ahead),
+        "estimated_seconds": estimated_seconds,
+        "eta_seconds": (ahead_seconds + estimated_seconds) / workers,
+        "workers": workers,
+    }
+
+
+async def capacity() -> Dict[str, Any]:
+    """Estimated work waiting in the queue and the time to drain it at the current pool size"""
+    await cost_model.refresh()
+    pending = await Queue.filter(claimable()).only("id", "asset_id", "model_type_id")
+    backlog_seconds = sum(cost_model.estimate(item) for item in pending)
+    workers = await active_workers()
+    return {
+        "pending": len(pending),
+        "backlog_seconds": backlog_seconds,
+        "workers": workers,
+        "drain_seconds": backlog_seconds / workers,
+        "timings": cost_model.samples,
+    }
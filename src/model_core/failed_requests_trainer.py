@@ -4,6 +4,7 @@ from tortoise.exceptions import MultipleObjectsReturned, DoesNotExist
 from model_core.model_builders.model_base import ModelBase
 from database.models import FailedQueue
 from model_core.trainer import Trainer
+from model_core.model_utils.window_prefetcher import WindowPrefetcher
 from utils.logger import make_log
 
 
@@ -14,6 +15,10 @@ class FailedRequestsTrainer(Trainer):
         self.current_request: FailedQueue = None  # Failed requests Queue Instance
         self.current_model_instance: ModelBase = None  # Model Builder Instance
         self.current_trained_model = None  # Keras Model
+        self.prefetcher = WindowPrefetcher()
+        self._heartbeat = None
+        self.warm_started = False
+        self.search_result = None
 
     async def _get_next_queue_item(
         self
@@ -22,7 +27,7 @@ class FailedRequestsTrainer(Trainer):
             queue_len = await FailedQueue.all().count()
             if queue_len == 0:
                 return None
-            queue_item = await FailedQueue.get()
+            queue_item = await FailedQueue.all().order_by("created_at").first()
         except (MultipleObjectsReturned, DoesNotExist) as e:
             make_log(
                 "FAILED_REQUESTS_TRAINER",
@@ -46,3 +51,9 @@ class FailedRequestsTrainer(Trainer):
                 f"No queue item found: {queue_item}",
             )
             return None
+
+    async def _peek_next_queue_item(self) -> Optional[FailedQueue]:
+        query = FailedQueue.all()
+        if self.current_request is not None:
+            query = query.exclude(id=self.current_request.id)
+        return await query.order_by("created_at").prefetch_related("asset").first()
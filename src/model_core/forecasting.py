@@ -0,0 +1,207 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from tortoise.functions import Max
+
+from database.models import Forecast, TrainedModel
+from model_core.inference import model_cache
+from model_core.model_utils.window_pipeline import (
+    data_init,
+    feature_engineering,
+    normalize_features,
+)
+from utils.logger import make_log
+
+HORIZON = int(os.getenv("FORECAST_HORIZON", "5"))
+REFRESH_SECONDS = int(os.getenv("FORECAST_REFRESH_SECONDS", "3600"))
+CACHE_SECONDS = int(os.getenv("FORECAST_CACHE_SECONDS", "60"))
+READ_CACHE_SIZE = int(os.getenv("FORECAST_READ_CACHE_SIZE", "1024"))
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close")
+
+
+def multi_step_forecast(
+    predict: Callable[[np.ndarray], np.ndarray],
+    raw_df: pd.DataFrame,
+    normalization: Dict[str, Any],
+    input_width: int,
+    horizon: int = HORIZON,
+) -> List[Dict[str, Any]]:
+    """Rolls a one-step Close model forward horizon business days.
+
+    Each predicted Close is appended as the next bar, with the other prices set to
+    it and volume carried over, so calendar features and normalization are
+    recomputed exactly as in training.
+
+    Args:
+        predict (Callable): Maps a normalized (1, input_width, features) array to (1, 1, 1)
+        raw_df (pd.DataFrame): Bars as returned by data_init, with a "Date" column
+        normalization (Dict[str, Any]): Stored training statistics of the model
+        input_width (int): Number of bars the model reads
+
+    Returns:
+        List[Dict[str, Any]]: One {"date", "close"} entry per forecast step
+    """
+    bars = raw_df.iloc[-input_width:].reset_index(drop=True)
+    std, mean = normalization["std"]["Close"], normalization["mean"]["Close"]
+    forecast = []
+    for _ in range(horizon):
+        features = normalize_features(feature_engineering(bars.copy()), normalization)
+        inputs = features.to_numpy(dtype=np.float32)[np.newaxis, ...]
+        close = float(np.asarray(predict(inputs)).reshape(-1)[0]) * std + mean
+
+        next_bar = bars.iloc[-1].copy()
+        next_bar["Date"] = pd.Timestamp(next_bar["Date"]) + pd.offsets.BDay()
+        for column in PRICE_COLUMNS:
+            if column in next_bar.index:
+                next_bar[column] = close
+        bars = pd.concat(
+            [bars.iloc[1:], next_bar.to_frame().T.astype(bars.dtypes.to_dict())],
+            ignore_index=True,
+        )
+
+        forecast.append(
+            {"date": next_bar["Date"].strftime("%Y-%m-%d"), "close": close}
+        )
+    return forecast
+
+
+def _last_bar_date(raw_df: pd.DataFrame) -> str:
+    return pd.Timestamp(raw_df["Date"].iloc[-1]).strftime("%Y-%m-%d")
+
+
+def compute_forecast(
+    keras_model, ticker: str, normalization: Dict[str, Any]
+) -> Tuple[str, List[Dict[str, Any]]]:
+    raw_df = data_init(ticker)
+    forecast = multi_step_forecast(
+        lambda inputs: keras_model(inputs, training=False).numpy(),
+        raw_df,
+        normalization,
+        keras_model.input_shape[1],
+    )
+    return _last_bar_date(raw_df), forecast
+
+
+async def save_forecast(
+    trained_model: TrainedModel, keras_model, ticker: str
+) -> Optional[Forecast]:
+    """Computes and stores the forecast of a freshly trained model"""
+    if not trained_model.normalization:
+        return None
+    last_bar_date, values = await asyncio.get_running_loop().run_in_executor(
+        None, compute_forecast, keras_model, ticker, trained_model.normalization
+    )
+    forecast, _ = await Forecast.update_or_create(
+        trained_model_id=trained_model.id,
+        defaults={
+            "asset_id": trained_model.asset_id,
+            "horizon": len(values),
+            "last_bar_date": last_bar_date,
+            "values": values,
+        },
+    )
+    make_log(
+        "FORECASTING",
+        20,
+        "forecasting.log",
+        f"Forecast stored for model {trained_model.id} from {last_bar_date}",
+    )
+    return forecast
+
+
+async def refresh_forecasts() -> int:
+    """Recomputes the forecasts whose asset got new bars since they were computed.
+
+    Only the newest model of each (asset, model type) is refreshed; forecasts of
+    superseded models keep the values they had when they were replaced.
+
+    Returns:
+        int: Number of forecasts refreshed
+    """
+    loop = asyncio.get_running_loop()
+    latest_models = (
+        await TrainedModel.annotate(latest=Max("id"))
+        .group_by("asset_id", "model_type_id")
+        .values_list("latest", flat=True)
+    )
+    forecasts = await Forecast.filter(
+        trained_model_id__in=latest_models
+    ).prefetch_related("asset")
+    last_bars: Dict[str, str] = {}
+    refreshed = 0
+    for forecast in forecasts:
+        ticker = forecast.asset.ticker
+        if ticker not in last_bars:
+            # Only appends missing bars to the OHLCV cache
+            raw_df = await loop.run_in_executor(None, data_init, ticker)
+            last_bars[ticker] = _last_bar_date(raw_df)
+        if last_bars[ticker] <= forecast.last_bar_date:
+            continue
+
+        entry = await model_cache.get(forecast.trained_model_id)
+        last_bar_date, values = await loop.run_in_executor(
+            None, compute_forecast, entry.model, ticker, entry.normalization
+        )
+        forecast.last_bar_date = last_bar_date
+        forecast.values = values
+        forecast.horizon = len(values)
+        await forecast.save()
+        refreshed += 1
+    return refreshed
+
+
+async def forecast_refresh_loop() -> None:
+    while True:
+        try:
+            refreshed = await refresh_forecasts()
+            make_log(
+                "FORECASTING",
+                20,
+                "forecasting.log",
+                f"Refreshed {refreshed} forecasts",
+            )
+        except Exception as e:
+            make_log(
+                "FORECASTING",
+                40,
+                "forecasting.log",
+                f"Forecast refresh failed: {str(e)}",
+            )
+        await asyncio.sleep(REFRESH_SECONDS)
+
+
+_read_cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+async def read_forecast(trained_model_id: int) -> Optional[Dict[str, Any]]:
+    """Serves a stored forecast, from memory when read within CACHE_SECONDS.
+
+    The memory cache keeps the READ_CACHE_SIZE most recently read models.
+    """
+    cached = _read_cache.get(trained_model_id)
+    if cached is not None and time.monotonic() - cached[0] < CACHE_SECONDS:
+        _read_cache.move_to_end(trained_model_id)
+        return cached[1]
+
+    forecast = await Forecast.filter(trained_model_id=trained_model_id).first()
+    if forecast is None:
+        _read_cache.pop(trained_model_id, None)
+        return None
+    payload = {
+        "trained_model_id": trained_model_id,
+        "last_bar_date": forecast.last_bar_date,
+        "horizon": forecast.horizon,
+        "forecast": forecast.values,
+        "updated_at": forecast.updated_at.isoformat(),
+    }
+    _read_cache[trained_model_id] = (time.monotonic(), payload)
+    _read_cache.move_to_end(trained_model_id)
+    while len(_read_cache) > READ_CACHE_SIZE:
+        _read_cache.popitem(last=False)
+    return payload
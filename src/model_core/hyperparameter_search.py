@@ -0,0 +1,238 @@
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import tensorflow as tf
+
+from model_core.model_builders.model_base import ModelBase
+from model_core.model_utils.window_generator import WindowGenerator
+from utils.logger import make_log
+from utils.tf_threads import configure_tf_threads, split_budget
+
+SEARCH = os.getenv("HYPERPARAMETER_SEARCH", "0") == "1"
+STRATEGY = os.getenv("HYPERPARAMETER_SEARCH_STRATEGY", "successive_halving")
+WORKERS = int(os.getenv("HYPERPARAMETER_SEARCH_WORKERS", "2"))
+MAX_CONFIGS = int(os.getenv("HYPERPARAMETER_SEARCH_MAX_CONFIGS", "9"))
+MIN_EPOCHS = int(os.getenv("HYPERPARAMETER_SEARCH_MIN_EPOCHS", "2"))
+MAX_EPOCHS = int(os.getenv("HYPERPARAMETER_SEARCH_MAX_EPOCHS", "20"))
+ETA = int(os.getenv("HYPERPARAMETER_SEARCH_ETA", "3"))
+
+Config = Dict[str, Any]
+Weights = List[np.ndarray]
+
+
+@dataclass
+class Trial:
+    hyperparameters: Config
+    rung: int
+    epochs: int
+    val_loss: float
+    pruned: bool
+
+
+@dataclass
+class SearchResult:
+    search_id: str
+    hyperparameters: Config
+    weights: Weights
+    trials: List[Trial] = field(default_factory=list)
+
+
+# Set once per search worker process, so every trial it runs reuses the same
+# cached dataset splits instead of rebuilding them per config
+_window: Optional[WindowGenerator] = None
+
+
+def _init_search_worker(
+    intra_op_threads: int, inter_op_threads: int, frames, window_kwargs: Dict
+) -> None:
+    global _window
+    configure_tf_threads(intra_op_threads, inter_op_threads)
+    train_df, val_df, test_df = frames
+    _window = WindowGenerator(
+        train_df=train_df, val_df=val_df, test_df=test_df, **window_kwargs
+    )
+
+
+def _run_trial(
+    model_class: Type[ModelBase],
+    hyperparameters: Config,
+    initial_epoch: int,
+    epochs: int,
+    weights: Optional[Weights],
+) -> Tuple[float, Weights]:
+    """Trains one config from initial_epoch up to epochs, resuming from weights"""
+    model = model_class(asset=None, window=_window, **hyperparameters).model
+    if weights is not None:
+        model.build((None, _window.input_width, len(_window.column_indices)))
+        model.set_weights(weights)
+    model.compile(
+        loss=tf.losses.MeanSquaredError(),
+        optimizer=tf.optimizers.Adam(),
+        metrics=[tf.metrics.MeanAbsoluteError()],
+    )
+    history = model.fit(
+        _window.train,
+        validation_data=_window.val,
+        initial_epoch=initial_epoch,
+        epochs=epochs,
+        verbose=0,
+    )
+    return history.history["val_loss"][-1], model.get_weights()
+
+
+def sample_configs(search_space: Dict[str, List], n_configs: int) -> List[Config]:
+    grid = [
+        dict(zip(search_space.keys(), values))
+        for values in itertools.product(*search_space.values())
+    ]
+    return random.sample(grid, min(n_configs, len(grid)))
+
+
+def successive_halving(
+    executor: ProcessPoolExecutor,
+    model_class: Type[ModelBase],
+    configs: List[Config],
+    min_epochs: int,
+    max_epochs: int,
+    eta: int,
+) -> Tuple[Config, float, Weights, List[Trial]]:
+    """Trains every config for min_epochs, keeps the best 1/eta and multiplies their
+    budget by eta, until one config is left or max_epochs is reached. Survivors
+    resume from their weights, so no epoch is trained twice.
+
+    Returns:
+        Tuple[Config, float, Weights, List[Trial]]: Winner, its val loss, its weights and every trial run
+    """
+    survivors: List[Tuple[Config, Optional[Weights]]] = [(config, None) for config in configs]
+    trials: List[Trial] = []
+    trained_epochs, budget, rung = 0, min_epochs, 0
+
+    while True:
+        target = min(budget, max_epochs)
+        futures = [
+            executor.submit(_run_trial, model_class, config, trained_epochs, target, weights)
+            for config, weights in survivors
+        ]
+        ranked = sorted(
+            (
+                (config, *future.result())
+                for (config, _), future in zip(survivors, futures)
+            ),
+            key=lambda result: result[1],
+        )
+        last_rung = len(ranked) == 1 or target >= max_epochs
+        keep = 1 if last_rung else max(1, len(ranked) // eta)
+        trials.extend(
+            Trial(config, rung, target, float(val_loss), pruned=position >= keep)
+            for position, (config, val_loss, _) in enumerate(ranked)
+        )
+        make_log(
+            "HYPERPARAMETER_SEARCH",
+            20,
+            "trainer_workflow.log",
+            f"Rung {rung}: {len(ranked)} configs at {target} epochs, best {ranked[0][0]} ({ranked[0][1]:.5f})",
+        )
+
+        if last_rung:
+            winner, val_loss, weights = ranked[0]
+            return winner, val_loss, weights, trials
+
+        survivors = [(config, weights) for config, _, weights in ranked[:keep]]
+        trained_epochs, budget, rung = target, budget * eta, rung + 1
+
+
+def hyperband(
+    executor: ProcessPoolExecutor,
+    model_class: Type[ModelBase],
+    search_space: Dict[str, List],
+    max_epochs: int,
+    eta: int,
+) -> Tuple[Config, float, Weights, List[Trial]]:
+    """Runs successive halving brackets that trade number of configs for epochs per config"""
+    s_max = int(math.log(max_epochs, eta))
+    best = None
+    trials: List[Trial] = []
+    for bracket in range(s_max, -1, -1):
+        n_configs = int(math.ceil((s_max + 1) / (bracket + 1) * eta ** bracket))
+        min_epochs = max(1, int(max_epochs * eta ** -bracket))
+        result = successive_halving(
+            executor,
+            model_class,
+            sample_configs(search_space, min(n_configs, MAX_CONFIGS)),
+            min_epochs,
+            max_epochs,
+            eta,
+        )
+        trials.extend(result[3])
+        if best is None or result[1] < best[1]:
+            best = result
+    return best[0], best[1], best[2], trials
+
+
+def run_search(
+    model_class: Type[ModelBase], window: WindowGenerator
+) -> Optional[SearchResult]:
+    """Searches model_class.search_space on window, running trials in a process pool
+
+    Args:
+        model_class (Type[ModelBase]): Model builder to search hyperparameters for
+        window (WindowGenerator): Data window shared by every trial
+
+    Returns:
+        Optional[SearchResult]: None if the model type has no search space
+    """
+    search_space = getattr(model_class, "search_space", None)
+    if not search_space:
+        return None
+
+    window_kwargs = {
+        "input_width": window.input_width,
+        "label_width": window.label_width,
+        "shift": window.shift,
+        "label_columns": window.label_columns,
+        "batch_size": window.batch_size,
+        "sequence_stride": window.sequence_stride,
+        "shuffle_buffer": window.shuffle_buffer,
+        "cache": "memory",
+        "backend": window.backend,
+    }
+    frames = (window.train_df, window.val_df, window.test_df)
+    # Trials share the calling trainer's thread budget, so a pool of N trainers
+    # searching at once still keeps to the cores the pool was sized for
+    workers, intra_op_threads = split_budget(WORKERS)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_search_worker,
+        initargs=(intra_op_threads, 1, frames, window_kwargs),
+    ) as executor:
+        if STRATEGY == "hyperband":
+            winner, val_loss, weights, trials = hyperband(
+                executor, model_class, search_space, MAX_EPOCHS, ETA
+            )
+        else:
+            winner, val_loss, weights, trials = successive_halving(
+                executor,
+                model_class,
+                sample_configs(search_space, MAX_CONFIGS),
+                MIN_EPOCHS,
+                MAX_EPOCHS,
+                ETA,
+            )
+
+    make_log(
+        "HYPERPARAMETER_SEARCH",
+        20,
+        "trainer_workflow.log",
+        f"Search finished after {len(trials)} trials, winner {winner} ({val_loss:.5f})",
+    )
+    return SearchResult(str(uuid.uuid4()), winner, weights, trials)
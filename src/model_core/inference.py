@@ -0,0 +1,169 @@
+import asyncio
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import tensorflow as tf
+
+from database.artifact_store import read_serialized_model
+from database.models import TrainedModel
+from model_core.model_utils.model_serializer import deserialize_model
+from model_core.micro_batcher import micro_batcher
+from model_core.model_utils.window_pipeline import (
+    data_init,
+    feature_engineering,
+    normalize_features,
+)
+from utils.logger import make_log
+
+CACHE_MAX_BYTES = int(os.getenv("PREDICT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+@dataclass
+class LoadedModel:
+    trained_model_id: int
+    ticker: str
+    model: tf.keras.Model
+    predict_fn: Callable
+    normalization: Dict[str, Any]
+    input_width: int
+    nbytes: int
+
+
+def _estimate_bytes(model: tf.keras.Model) -> int:
+    # Weights dominate; the traced predict graph adds roughly as much again
+    return 2 * sum(int(np.prod(w.shape)) * w.dtype.size for w in model.weights)
+
+
+def _load(trained_model: TrainedModel, serialized_model: bytes) -> LoadedModel:
+    model = deserialize_model(serialized_model)
+    input_width = model.input_shape[1]
+    n_features = model.input_shape[2]
+    predict_fn = tf.function(
+        lambda inputs: model(inputs, training=False),
+        input_signature=[
+            tf.TensorSpec(shape=(None, input_width, n_features), dtype=tf.float32)
+        ],
+    )
+    return LoadedModel(
+        trained_model_id=trained_model.id,
+        ticker=trained_model.asset.ticker,
+        model=model,
+        predict_fn=predict_fn,
+        normalization=trained_model.normalization,
+        input_width=input_width,
+        nbytes=_estimate_bytes(model),
+    )
+
+
+class ModelLRUCache:
+    """Keeps deserialized models and their traced predict functions in memory,
+    evicting the least recently used ones once their estimated size exceeds max_bytes"""
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[int, LoadedModel]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+
+    async def get(self, trained_model_id: int) -> LoadedModel:
+        """Returns a cached model, loading it once even under concurrent requests
+
+        Raises:
+            DoesNotExist: No TrainedModel with that id
+            ValueError: The model was saved without normalization statistics
+        """
+        entry = self._entries.get(trained_model_id)
+        if entry is not None:
+            self._entries.move_to_end(trained_model_id)
+            return entry
+
+        pending = self._loading.get(trained_model_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[trained_model_id] = future
+        try:
+            entry = await self._load(trained_model_id)
+            self._insert(entry)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an exception without waiters is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._loading[trained_model_id]
+
+    async def _load(self, trained_model_id: int) -> LoadedModel:
+        trained_model = await TrainedModel.get(id=trained_model_id).prefetch_related("asset")
+        if not trained_model.normalization:
+            raise ValueError(
+                f"Model {trained_model_id} has no stored normalization statistics")
+        serialized_model = await read_serialized_model(trained_model)
+        entry = await asyncio.get_running_loop().run_in_executor(
+            None, _load, trained_model, serialized_model
+        )
+        make_log(
+            "MODEL_CACHE",
+            20,
+            "inference.log",
+            f"Loaded model {trained_model_id} (~{entry.nbytes} bytes)",
+        )
+        return entry
+
+    def _insert(self, entry: LoadedModel) -> None:
+        self._entries[entry.trained_model_id] = entry
+        self.current_bytes += entry.nbytes
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            make_log(
+                "MODEL_CACHE",
+                20,
+                "inference.log",
+                f"Evicted model {evicted.trained_model_id}",
+            )
+
+    def invalidate(self, trained_model_id: int) -> None:
+        evicted = self._entries.pop(trained_model_id, None)
+        if evicted is not None:
+            self.current_bytes -= evicted.nbytes
+
+
+model_cache = ModelLRUCache()
+
+
+def latest_inputs(entry: LoadedModel, end: Optional[str] = None) -> np.ndarray:
+    """Normalized (1, input_width, features) window of the most recent bars"""
+    df = feature_engineering(data_init(entry.ticker, end=end))
+    features = normalize_features(df, entry.normalization)
+    window = features.iloc[-entry.input_width:].to_numpy(dtype=np.float32)
+    return window[np.newaxis, ...]
+
+
+def denormalize_close(entry: LoadedModel, values: np.ndarray) -> np.ndarray:
+    return values * entry.normalization["std"]["Close"] + entry.normalization["mean"]["Close"]
+
+
+async def predict(trained_model_id: int) -> Dict[str, Any]:
+    """Next-step Close forecast of a trained model for its asset
+
+    Returns:
+        Dict[str, Any]: Model id, ticker and the forecast Close values
+    """
+    entry = await model_cache.get(trained_model_id)
+    loop = asyncio.get_running_loop()
+    inputs = await loop.run_in_executor(None, latest_inputs, entry)
+    outputs = await micro_batcher.submit(
+        entry.trained_model_id, entry.predict_fn, inputs
+    )
+    return {
+        "trained_model_id": entry.trained_model_id,
+        "ticker": entry.ticker,
+        "forecast": denormalize_close(entry, outputs.reshape(-1)).tolist(),
+    }
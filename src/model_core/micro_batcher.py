@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from utils.logger import make_log
+
+MAX_BATCH_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+MAX_QUEUE_DEPTH = int(os.getenv("MICRO_BATCH_MAX_QUEUE_DEPTH", "1024"))
+IDLE_SECONDS = 60
+
+
+class BatcherFull(Exception):
+    pass
+
+
+@dataclass
+class BatchMetrics:
+    requests: int = 0
+    batches: int = 0
+    rejected: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    total_wait_ms: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["mean_batch_size"] = self.requests / self.batches if self.batches else 0.0
+        data["mean_wait_ms"] = self.total_wait_ms / self.requests if self.requests else 0.0
+        return data
+
+
+class MicroBatcher:
+    """Coalesces concurrent predict calls on the same model into one batched call.
+
+    Each model gets a queue and a worker task. The worker takes the first waiting
+    request, keeps collecting until max_batch_size requests or max_wait_ms have
+    passed, stacks the inputs, runs the model once in a thread and resolves every
+    caller with its own slice of the output.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = max_queue_depth
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._metrics: Dict[int, BatchMetrics] = {}
+
+    async def submit(
+        self, model_id: int, predict_fn: Callable, inputs: np.ndarray
+    ) -> np.ndarray:
+        """Queues one (1, ...) input for model_id and waits for its output row
+
+        Raises:
+            BatcherFull: The model already has max_queue_depth requests waiting
+        """
+        queue = self._queues.get(model_id)
+        if queue is None:
+            queue = self._queues[model_id] = asyncio.Queue(self.max_queue_depth)
+            self._metrics.setdefault(model_id, BatchMetrics())
+        metrics = self._metrics[model_id]
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            queue.put_nowait((inputs, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            metrics.rejected += 1
+            raise BatcherFull(f"Too many pending predictions for model {model_id}")
+        metrics.queue_depth = queue.qsize()
+        metrics.max_queue_depth = max(metrics.max_queue_depth, metrics.queue_depth)
+
+        if model_id not in self._workers:
+            self._workers[model_id] = asyncio.create_task(
+                self._worker(model_id, predict_fn, queue)
+            )
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue, first: Tuple) -> List[Tuple]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(
+        self, model_id: int, predict_fn: Callable, queue: asyncio.Queue
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        metrics = self._metrics[model_id]
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # No await between the check and the removal, so no request
+                    # can slip into a queue nobody is serving
+                    del self._workers[model_id]
+                    del self._queues[model_id]
+                    return
+                continue
+            batch = await self._collect(queue, first)
+            metrics.queue_depth = queue.qsize()
+
+            started = time.perf_counter()
+            inputs = np.concatenate([item[0] for item in batch])
+            try:
+                outputs = await loop.run_in_executor(
+                    None, lambda: predict_fn(tf.constant(inputs)).numpy()
+                )
+            except Exception as e:
+                make_log(
+                    "MICRO_BATCHER",
+                    40,
+                    "inference.log",
+                    f"Batch of {len(batch)} failed for model {model_id}: {str(e)}",
+                )
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_inputs, future, enqueued in batch:
+                rows = len(item_inputs)
+                if not future.done():
+                    future.set_result(outputs[offset:offset + rows])
+                offset += rows
+                metrics.total_wait_ms += (started - enqueued) * 1000
+
+            metrics.requests += len(batch)
+            metrics.batches += 1
+            metrics.last_batch_size = len(batch)
+            metrics.max_batch_size = max(metrics.max_batch_size, len(batch))
+
+    def metrics(self) -> Dict[int, Dict[str, Any]]:
+        return {model_id: m.snapshot() for model_id, m in self._metrics.items()}
+
+
+micro_batcher = MicroBatcher()
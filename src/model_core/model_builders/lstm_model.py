@@ -5,9 +5,11 @@ from model_core.model_builders.model_base import ModelBase
 
 
 class LSTMModel(ModelBase):
-    def __init__(self, asset, units=50):
-        super().__init__(asset)
+    search_space = {"units": [16, 32, 50, 64, 96, 128]}
+
+    def __init__(self, asset, units=50, window=None):
         self.units = units
+        super().__init__(asset, window=window)
 
     def build_model(self):
         model = tf.keras.Sequential(
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
 
 from model_core.model_utils.window_pipeline import data_processing
 
 
 class ModelBase(ABC):
-    def __init__(self, asset):
-        self.window = data_processing(asset)
+    # Hyperparameter name -> candidate values explored by hyperparameter search
+    search_space: Dict[str, List] = {}
+
+    def __init__(self, asset, window=None):
+        self.window = window if window is not None else data_processing(asset)
         self.model = self.build_model()
 
     @abstractmethod
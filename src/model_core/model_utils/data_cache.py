@@ -0,0 +1,230 @@
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import make_log
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(current_dir, "..", "..")
+
+CACHE_DIR = os.getenv("DATA_CACHE_DIR", os.path.join(root, "datasets", "cache"))
+
+# Returns None or raises when the request fails, and an empty frame when the range has no bars
+Downloader = Callable[[str, str, str, str], Optional[pd.DataFrame]]
+
+
+class OHLCVCache:
+    """Persistent per (ticker, interval) bar store backed by memory-mapped NumPy files.
+
+    Each key lives in its own directory with three files:
+        index.npy   int64 timestamps (ns since epoch), sorted
+        values.npy  float64 matrix, one column per OHLCV field
+        meta.json   column names and the date range already fetched
+
+    The fetched range is tracked separately from the bar timestamps so that
+    weekends and holidays inside it do not trigger a download on every request.
+    """
+
+    def __init__(self, downloader: Downloader, cache_dir: str = CACHE_DIR):
+        self.downloader = downloader
+        self.cache_dir = cache_dir
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def get(
+        self, ticker: str, start: str, end: str, interval: str
+    ) -> Optional[pd.DataFrame]:
+        """Returns bars in [start, end), downloading only the ranges not yet cached
+
+        Args:
+            ticker (str): Asset ticker
+            start (str): Inclusive start date, YYYY-MM-DD
+            end (str): Exclusive end date, YYYY-MM-DD
+            interval (str): Bar interval, e.g. "1d" or "1h"
+
+        Returns:
+            Optional[pd.DataFrame]: Bars indexed by "Date", None if nothing is available
+        """
+        with self._lock(ticker, interval):
+            meta = self._read_meta(ticker, interval)
+            if meta is None:
+                df = self._download(ticker, start, end, interval)
+                if df is None or df.empty:
+                    return None
+                self._write(ticker, interval, df, start, end)
+            else:
+                self._refresh(ticker, interval, meta, start, end)
+
+            return self._slice(ticker, interval, start, end)
+
+    def _refresh(
+        self, ticker: str, interval: str, meta: Dict, start: str, end: str
+    ) -> None:
+        frames = [self._load(ticker, interval, meta)]
+        covered_start, covered_end = meta["covered_start"], meta["covered_end"]
+
+        # A failed download leaves its side uncovered so the next request retries it
+        # instead of leaving a gap. One that succeeds without bars (weekends,
+        # holidays) still covers the range, the tail only up to the last closed
+        # session since today's bar may not be published yet
+        if start < covered_start:
+            head = self._download(ticker, start, covered_start, interval)
+            if head is not None:
+                if not head.empty:
+                    frames.insert(0, head)
+                covered_start = start
+
+        if end > covered_end:
+            tail = self._download(ticker, covered_end, end, interval)
+            if tail is not None:
+                if not tail.empty:
+                    frames.append(tail)
+                    covered_end = end
+                else:
+                    covered_end = max(covered_end, _closed_until(end))
+
+        if (covered_start, covered_end) == (meta["covered_start"], meta["covered_end"]):
+            return
+
+        df = pd.concat(frames)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        self._write(ticker, interval, df, covered_start, covered_end)
+
+    def _download(
+        self, ticker: str, start: str, end: str, interval: str
+    ) -> Optional[pd.DataFrame]:
+        make_log(
+            "DATA_CACHE",
+            20,
+            "data_pipeline.log",
+            f"Fetching {ticker} ({interval}) bars from {start} to {end}",
+        )
+        try:
+            df = self.downloader(ticker, start, end, interval)
+        except Exception as e:
+            make_log(
+                "DATA_CACHE",
+                40,
+                "data_pipeline.log",
+                f"Fetching {ticker} ({interval}) bars from {start} to {end} failed: {str(e)}",
+            )
+            return None
+        if df is None:
+            return None
+        if df.empty:
+            return df
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df.index = pd.to_datetime(df.index, utc=True)
+        df.index.name = "Date"
+        return df.astype(np.float64)
+
+    def _slice(
+        self, ticker: str, interval: str, start: str, end: str
+    ) -> Optional[pd.DataFrame]:
+        meta = self._read_meta(ticker, interval)
+        if meta is None:
+            return None
+        index = np.load(self._path(ticker, interval, "index.npy"), mmap_mode="r")
+        values = np.load(self._path(ticker, interval, "values.npy"), mmap_mode="r")
+
+        lo = np.searchsorted(index, _to_ns(start), side="left")
+        hi = np.searchsorted(index, _to_ns(end), side="left")
+        if lo >= hi:
+            return None
+
+        return pd.DataFrame(
+            values[lo:hi],
+            index=pd.DatetimeIndex(index[lo:hi], tz="UTC", name="Date"),
+            columns=meta["columns"],
+        )
+
+    def _load(self, ticker: str, interval: str, meta: Dict) -> pd.DataFrame:
+        index = np.load(self._path(ticker, interval, "index.npy"))
+        values = np.load(self._path(ticker, interval, "values.npy"))
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(index, tz="UTC", name="Date"),
+            columns=meta["columns"],
+        )
+
+    def _write(
+        self,
+        ticker: str,
+        interval: str,
+        df: pd.DataFrame,
+        covered_start: str,
+        covered_end: str,
+    ) -> None:
+        index = df.index.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]")
+        values = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+        columns: List[str] = [str(column) for column in df.columns]
+
+        self._replace(ticker, interval, "index.npy", lambda f: np.save(f, index.astype(np.int64)))
+        self._replace(ticker, interval, "values.npy", lambda f: np.save(f, values))
+        meta = {
+            "columns": columns,
+            "covered_start": covered_start,
+            "covered_end": covered_end,
+        }
+        self._replace(ticker, interval, "meta.json", lambda f: f.write(json.dumps(meta).encode()))
+
+        make_log(
+            "DATA_CACHE",
+            20,
+            "data_pipeline.log",
+            f"Cached {len(df)} {ticker} ({interval}) bars covering {covered_start} to {covered_end}",
+        )
+
+    def _replace(self, ticker: str, interval: str, name: str, writer) -> None:
+        path = self._path(ticker, interval, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            writer(file)
+        os.replace(tmp_path, path)
+
+    def _read_meta(self, ticker: str, interval: str) -> Optional[Dict]:
+        path = self._path(ticker, interval, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            return json.load(file)
+
+    def _path(self, ticker: str, interval: str, name: str) -> str:
+        return os.path.join(self.cache_dir, ticker, interval, name)
+
+    @contextmanager
+    def _lock(self, ticker: str, interval: str):
+        """Serializes access to one key across threads and processes, so concurrent
+        requests for the same ticker trigger a single download"""
+        key = (ticker, interval)
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+
+        key_dir = os.path.join(self.cache_dir, ticker, interval)
+        os.makedirs(key_dir, exist_ok=True)
+        with thread_lock, open(os.path.join(key_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _closed_until(end: str) -> str:
+    """end, capped at the exclusive end of the last closed session: today, or
+    tomorrow on a weekend, when no session is open"""
+    today = pd.Timestamp.now(tz="UTC").normalize()
+    if today.dayofweek >= 5:
+        today += pd.Timedelta(days=1)
+    return min(end, today.strftime("%Y-%m-%d"))
+
+
+def _to_ns(date: str) -> int:
+    return int(pd.Timestamp(date, tz="UTC").value)
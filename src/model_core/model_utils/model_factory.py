@@ -6,7 +6,7 @@ from model_core.model_builders.lstm_model import LSTMModel
 from database.models import ModelType
 from utils.logger import make_log
 
-MODEL_MAPPING = Dict[str, Type[ModelBase]] = {
+MODEL_MAPPING: Dict[str, Type[ModelBase]] = {
     os.getenv("LSTM_MODEL_NAME"): LSTMModel,
 }
 
@@ -29,7 +29,6 @@ class ModelFactory:
         model_constructor = MODEL_MAPPING.get(model_type.model_name, None)
         if model_constructor:
             try:
-                model_constructor(**kwargs)
                 return model_constructor(**kwargs)
             except TypeError:
                 return None
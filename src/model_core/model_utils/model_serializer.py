@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import struct
+
+import h5py
+import numpy as np
+import tensorflow as tf
+
+# Header: magic, format version, flags
+MAGIC = b"TYMD"
+VERSION = 1
+HEADER = struct.Struct("<4sBB")
+FLAG_ZSTD = 0b01
+FLAG_FLOAT16 = 0b10
+
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+COMPRESSION = os.getenv("MODEL_SERIALIZATION_COMPRESSION", "zstd")
+ZSTD_LEVEL = int(os.getenv("MODEL_SERIALIZATION_ZSTD_LEVEL", "3"))
+FLOAT16 = os.getenv("MODEL_SERIALIZATION_FLOAT16", "0") == "1"
+
+
+def serialize_model(
+    model: tf.keras.Model,
+    compression: str = COMPRESSION,
+    float16: bool = FLOAT16,
+) -> bytes:
+    """Serializes architecture and weights straight to bytes, no temp files involved.
+
+    The payload is an npz archive holding the Keras config as JSON plus one array
+    per weight, optionally cast to float16 and compressed with zstd.
+
+    Args:
+        model (tf.keras.Model): Built Keras model
+        compression (str, optional): "zstd" or "none". Defaults to MODEL_SERIALIZATION_COMPRESSION.
+        float16 (bool, optional): Store weights as float16. Defaults to MODEL_SERIALIZATION_FLOAT16.
+
+    Returns:
+        bytes: Serialized model
+    """
+    flags = 0
+    weights = model.get_weights()
+    if float16:
+        flags |= FLAG_FLOAT16
+        weights = [
+            w.astype(np.float16) if w.dtype == np.float32 else w for w in weights
+        ]
+
+    config = json.dumps(
+        {"class_name": model.__class__.__name__, "config": model.get_config()}
+    ).encode()
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        config=np.frombuffer(config, dtype=np.uint8),
+        **{f"w{i}": w for i, w in enumerate(weights)},
+    )
+    payload = buffer.getvalue()
+
+    if compression == "zstd":
+        import zstandard  # Only needed when compressing
+
+        flags |= FLAG_ZSTD
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+
+    return HEADER.pack(MAGIC, VERSION, flags) + payload
+
+
+def deserialize_model(serialized_model: bytes) -> tf.keras.Model:
+    """Rebuilds a model from serialize_model output or from a legacy HDF5 blob.
+
+    Returns:
+        tf.keras.Model: Model with its weights restored. Models from serialize_model
+        come back uncompiled.
+    """
+    serialized_model = bytes(serialized_model)
+    if serialized_model.startswith(HDF5_SIGNATURE):
+        with h5py.File(io.BytesIO(serialized_model), "r") as file:
+            return tf.keras.models.load_model(file)
+
+    magic, version, flags = HEADER.unpack_from(serialized_model)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unknown model format: {magic!r} v{version}")
+
+    payload = serialized_model[HEADER.size:]
+    if flags & FLAG_ZSTD:
+        import zstandard  # Only needed for compressed payloads
+
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+
+    with np.load(io.BytesIO(payload)) as archive:
+        config = json.loads(archive["config"].tobytes())
+        weights = [archive[f"w{i}"] for i in range(len(archive.files) - 1)]
+
+    if flags & FLAG_FLOAT16:
+        weights = [
+            w.astype(np.float32) if w.dtype == np.float16 else w for w in weights
+        ]
+
+    model = tf.keras.models.model_from_json(json.dumps(config))
+    model.set_weights(weights)
+    return model
@@ -1,4 +1,7 @@
+import hashlib
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 import tensorflow as tf
 
@@ -6,10 +9,16 @@ import tensorflow as tf
 class WindowGenerator():
     def __init__(self, input_width, label_width, shift,
                  train_df, val_df, test_df,
-                 label_columns=None):
+                 label_columns=None, batch_size=32, sequence_stride=1,
+                 shuffle_buffer=1024, cache="memory",
+                 backend="keras", normalization=None, ticker=None):
         self.train_df = train_df
         self.val_df = val_df
         self.test_df = test_df
+        # Training statistics, kept so inference can normalize new bars the same way
+        self.normalization = normalization
+        # Only names on-disk cache files, which are also keyed by their contents
+        self.ticker = ticker
 
         self.label_columns = label_columns
         if label_columns is not None:
@@ -22,6 +31,19 @@ class WindowGenerator():
         self.label_width = label_width
         self.shift = shift
 
+        self.batch_size = batch_size
+        self.sequence_stride = sequence_stride
+        self.shuffle_buffer = shuffle_buffer
+        # None rebuilds the pipeline on every access, "memory" caches windows
+        # in RAM, any other value is used as an on-disk cache file prefix.
+        self.cache = cache
+        # "keras" uses timeseries_dataset_from_array, "strided" serves batches
+        # from a zero-copy sliding window view over one float32 buffer.
+        if backend not in ("keras", "strided"):
+            raise ValueError(f"Unknown window backend: {backend}")
+        self.backend = backend
+        self._datasets = {}
+
         self.total_window_size = input_width + shift
 
         self.input_slice = slice(0, input_width)
@@ -33,6 +55,12 @@ class WindowGenerator():
         self.label_indices = np.arange(self.total_window_size)[
             self.labels_slice]
 
+        if label_columns is not None:
+            self.label_column_positions = np.array(
+                [self.column_indices[name] for name in label_columns])
+        else:
+            self.label_column_positions = np.arange(len(train_df.columns))
+
     def __repr__(self):
         return '\n'.join([
             f'Total window size: {self.total_window_size}',
@@ -91,31 +119,117 @@ class WindowGenerator():
 
         plt.xlabel('Time')
 
-    def make_dataset(self, data):
+    def make_dataset(self, data, shuffle=True):
         data = np.array(data, dtype=np.float32)
         ds = tf.keras.preprocessing.timeseries_dataset_from_array(
             data=data,
             targets=None,
             sequence_length=self.total_window_size,
-            sequence_stride=1,
-            shuffle=True,
-            batch_size=32,)
+            sequence_stride=self.sequence_stride,
+            shuffle=shuffle,
+            batch_size=self.batch_size,)
 
         ds = ds.map(self.split_window)
 
         return ds
 
+    def make_cached_dataset(self, data, split, shuffle=True):
+        """Builds a split once and caches its windows, so later epochs and
+        later reads only pay for shuffling and batching"""
+        data = np.array(data, dtype=np.float32)
+        ds = tf.keras.preprocessing.timeseries_dataset_from_array(
+            data=data,
+            targets=None,
+            sequence_length=self.total_window_size,
+            sequence_stride=self.sequence_stride,
+            shuffle=False,
+            batch_size=None,)
+
+        ds = ds.cache() if self.cache == "memory" else ds.cache(
+            self.cache_path(data, split))
+        if shuffle:
+            ds = ds.shuffle(self.shuffle_buffer, reshuffle_each_iteration=True)
+        ds = ds.batch(self.batch_size)
+        ds = ds.map(self.split_window, num_parallel_calls=tf.data.AUTOTUNE)
+
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+    def cache_path(self, data, split):
+        """On-disk cache file of a split. The digest covers the window parameters
+        and the split's values, so another ticker, data version or window shape
+        never reads these files"""
+        digest = hashlib.sha256(repr((
+            self.input_width, self.label_width, self.shift,
+            self.sequence_stride, list(self.column_indices),
+            data.shape,
+        )).encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+        return f"{self.cache}_{self.ticker or 'window'}_{digest.hexdigest()[:16]}_{split}"
+
+    def make_strided_dataset(self, data, shuffle=True):
+        """Serves batches from a (N, total_window_size, features) view over a
+        single contiguous buffer. Only the rows of the current batch are
+        gathered, so memory grows with series length, not with window width"""
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        windows = sliding_window_view(
+            data, self.total_window_size, axis=0
+        )[::self.sequence_stride].transpose(0, 2, 1)
+
+        n_features = data.shape[1]
+        n_labels = len(self.label_column_positions)
+        rows = np.arange(len(windows))
+        label_rows = self.label_indices[:, np.newaxis]
+        label_cols = self.label_column_positions[np.newaxis, :]
+
+        def generator():
+            order = np.random.permutation(rows) if shuffle else rows
+            for start in range(0, len(order), self.batch_size):
+                batch = windows[np.sort(order[start:start + self.batch_size])]
+                yield (batch[:, self.input_slice, :],
+                       batch[:, label_rows, label_cols])
+
+        return tf.data.Dataset.from_generator(
+            generator,
+            output_signature=(
+                tf.TensorSpec(
+                    shape=(None, self.input_width, n_features),
+                    dtype=tf.float32),
+                tf.TensorSpec(
+                    shape=(None, self.label_width, n_labels),
+                    dtype=tf.float32),
+            ),
+        ).prefetch(tf.data.AUTOTUNE)
+
+    def get_dataset(self, split, shuffle=True):
+        df = getattr(self, f"{split}_df")
+        key = (split, shuffle)
+        if self.backend == "strided":
+            ds = self._datasets.get(key)
+            if ds is None:
+                ds = self.make_strided_dataset(df, shuffle=shuffle)
+                self._datasets[key] = ds
+            return ds
+
+        if self.cache is None:
+            return self.make_dataset(df, shuffle=shuffle)
+
+        ds = self._datasets.get(key)
+        if ds is None:
+            ds = self.make_cached_dataset(df, split, shuffle=shuffle)
+            self._datasets[key] = ds
+        return ds
+
     @property
     def train(self):
-        return self.make_dataset(self.train_df)
+        return self.get_dataset("train")
 
     @property
     def val(self):
-        return self.make_dataset(self.val_df)
+        return self.get_dataset("val", shuffle=False)
 
     @property
     def test(self):
-        return self.make_dataset(self.test_df)
+        return self.get_dataset("test", shuffle=False)
 
     @property
     def example(self):
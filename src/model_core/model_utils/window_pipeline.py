@@ -3,23 +3,54 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import yfinance as yf
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 
 from utils.logger import make_log
 from model_core.model_utils.window_generator import WindowGenerator
+from model_core.model_utils.data_cache import OHLCVCache
 
 
-def data_init(
+def download_data(
     ticker: str, start: str, end: str, interval: str
 ) -> Optional[pd.DataFrame]:
-    # df = pd.read_csv(filepath)
-    df = yf.download(
-        ticker,
-        start=start if start else get_datetimes("start"),
-        end=end if end else get_datetimes("end"),
-        interval=interval if interval else "1d",
-    )
-    if df.empty():
+    """Bars of ticker in [start, end), with the columns of yf.download
+
+    Raises when the request fails. yf.download would log the error and return an
+    empty frame, the same as a range without bars, which the cache must tell apart.
+    """
+    try:
+        return yf.Ticker(ticker).history(
+            start=start,
+            end=end,
+            interval=interval,
+            auto_adjust=False,
+            actions=False,
+            raise_errors=True,
+        )
+    except Exception as e:
+        if "No price data found" in str(e):
+            return pd.DataFrame()
+        raise
+
+
+# "keras" or "strided", see WindowGenerator
+WINDOW_BACKEND = os.getenv("WINDOW_BACKEND", "keras")
+
+ohlcv_cache = OHLCVCache(download_data)
+
+
+def data_init(
+    ticker: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    interval: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    start = start if start else get_datetimes("start")
+    end = end if end else get_datetimes("end")
+    interval = interval if interval else "1d"
+
+    df = ohlcv_cache.get(ticker, start, end, interval)
+    if df is None or df.empty:
         make_log(
             "WINDOW_PIPELINE",
             40,
@@ -27,7 +58,7 @@ def data_init(
             f"Couldn't download data for {ticker}, trying with local dataset",
         )
         local_df = load_local_data(ticker, start, end)
-        if local_df.empty():
+        if local_df is None or local_df.empty:
             make_log(
                 "WINDOW_PIPELINE",
                 40,
@@ -36,8 +67,10 @@ def data_init(
             )
             raise TypeError
         df = local_df
+    else:
+        df = df.reset_index()
     columns_to_drop = df.columns[df.iloc[0] == 0.0]
-    if columns_to_drop:
+    if not columns_to_drop.empty:
         df.drop(columns_to_drop, axis=1, inplace=True)
     return df
 
@@ -64,6 +97,22 @@ def data_split(df):
     return train_df, val_df, test_df
 
 
+def normalization_stats(train_df) -> Dict[str, Any]:
+    """Column order and training statistics needed to normalize new inputs"""
+    return {
+        "columns": [str(column) for column in train_df.columns],
+        "mean": train_df.mean().to_dict(),
+        "std": train_df.std().to_dict(),
+    }
+
+
+def normalize_features(df, normalization: Dict[str, Any]) -> pd.DataFrame:
+    columns = normalization["columns"]
+    mean = pd.Series(normalization["mean"])[columns]
+    std = pd.Series(normalization["std"])[columns]
+    return (df[columns] - mean) / std
+
+
 def data_normalization(train_df, val_df, test_df):
     train_mean = train_df.mean()
     train_std = train_df.std()
@@ -79,6 +128,7 @@ def data_processing(ticker: str) -> Optional[WindowGenerator]:
     df = data_init(ticker)
     engineered_df = feature_engineering(df)
     train_df, val_df, test_df = data_split(engineered_df)
+    normalization = normalization_stats(train_df)
     train_df, val_df, test_df = data_normalization(train_df, val_df, test_df)
 
     return WindowGenerator(
@@ -89,7 +139,73 @@ def data_processing(ticker: str) -> Optional[WindowGenerator]:
         val_df=val_df,
         test_df=test_df,
         label_columns=["Close"],
+        normalization=normalization,
+        backend=WINDOW_BACKEND,
+        ticker=ticker,
+    )
+
+
+def incremental_data_processing(
+    ticker: str,
+    since: datetime,
+    replay: int,
+    val_bars: int,
+    normalization: Dict[str, Any],
+) -> Optional[WindowGenerator]:
+    """Builds a fine-tuning window for a model trained on the bars up to since.
+
+    The bars newer than since plus the replay bars before them are the training
+    set, and the last val_bars bars are both the validation and the test set, so a
+    daily refresh with a single new bar still has enough of each to window. The
+    newest bars are in both sets then; validation only checks for drift and
+    reports the loss, it does not select the model.
+
+    Inputs are normalized with the statistics the previous model was trained with,
+    which the fine-tuned model keeps.
+
+    Args:
+        ticker (str): Asset ticker
+        since (datetime): Training timestamp of the previous model
+        replay (int): Number of already seen bars trained on again
+        val_bars (int): Length of the validation tail
+        normalization (Dict[str, Any]): Stored normalization of the previous model
+
+    Returns:
+        Optional[WindowGenerator]: None if the training set or the validation tail
+        is too short to window, or the features no longer match the statistics
+    """
+    df = data_init(ticker)
+    dates = pd.to_datetime(df["Date"], utc=True)
+    since = pd.Timestamp(since)
+    if since.tzinfo is None:
+        since = since.tz_localize("UTC")
+
+    engineered_df = feature_engineering(df)
+    if not set(normalization["columns"]) <= set(engineered_df.columns):
+        return None
+    normalized_df = normalize_features(engineered_df, normalization)
+
+    first_new = int((dates <= since).sum())
+    train_df = normalized_df[max(0, first_new - replay):]
+    val_df = normalized_df[-val_bars:]
+
+    window = WindowGenerator(
+        input_width=30,
+        label_width=1,
+        shift=1,
+        train_df=train_df,
+        val_df=val_df,
+        test_df=val_df,
+        label_columns=["Close"],
+        normalization=normalization,
+        backend=WINDOW_BACKEND,
+        ticker=ticker,
     )
+    if len(train_df) < window.total_window_size:
+        return None
+    if len(val_df) < window.total_window_size:
+        return None
+    return window
 
 
 def get_datetimes(signal: str) -> Optional[Any]:
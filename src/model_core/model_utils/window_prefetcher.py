@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from model_core.model_utils.window_generator import WindowGenerator
+from model_core.model_utils.window_pipeline import data_processing
+from utils.logger import make_log
+
+
+class WindowPrefetcher:
+    """Prepares the WindowGenerator of the next queue item in a background thread
+    while the current model trains, so download latency hides behind fit time"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="window-prefetch")
+        self._pending: Optional[Tuple[int, Future]] = None
+
+    def schedule(self, queue_item_id: int, ticker: str) -> None:
+        """Starts processing data for a queue item, replacing any other pending item
+
+        Args:
+            queue_item_id (int): Queue item the window belongs to
+            ticker (str): Asset ticker to download and process
+        """
+        if self._pending is not None:
+            pending_id, future = self._pending
+            if pending_id == queue_item_id:
+                return
+            future.cancel()
+
+        self._pending = (
+            queue_item_id,
+            self._executor.submit(data_processing, ticker),
+        )
+        make_log(
+            "WINDOW_PREFETCHER",
+            20,
+            "trainer_workflow.log",
+            f"Prefetching window for queue item {queue_item_id} ({ticker})",
+        )
+
+    async def take(self, queue_item_id: int) -> Optional[WindowGenerator]:
+        """Hands over the prefetched window, waiting for it if still in progress
+
+        Args:
+            queue_item_id (int): Queue item about to be trained
+
+        Returns:
+            Optional[WindowGenerator]: Prefetched window, None if the item was not
+            prefetched or its processing failed
+        """
+        if self._pending is None or self._pending[0] != queue_item_id:
+            return None
+
+        _, future = self._pending
+        self._pending = None
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            make_log(
+                "WINDOW_PREFETCHER",
+                30,
+                "trainer_workflow.log",
+                f"Prefetch failed for queue item {queue_item_id}: {str(e)}",
+            )
+            return None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import socket
+from datetime import timedelta
+from typing import Optional
+
+from tortoise import timezone
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from database.models import Queue
+from utils.logger import make_log
+
+LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claimable() -> Q:
+    """Rows nobody holds: pending ones and in-progress ones whose lease expired"""
+    return Q(status=PENDING) | Q(status=IN_PROGRESS, lease_expires_at__lt=timezone.now())
+
+
+class QueueLease:
+    """Claims Queue rows for one worker so several trainer replicas can share a queue.
+
+    A claim selects a candidate with SELECT ... FOR UPDATE SKIP LOCKED (ignored on
+    backends without row locks, such as SQLite) and then takes it with a conditional
+    UPDATE that only succeeds if the row is still claimable. Claimed rows carry the
+    worker id and a lease expiry that a heartbeat keeps renewing; rows whose worker
+    died become claimable again once the lease runs out.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, lease_seconds: int = LEASE_SECONDS):
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+
+    def _expiry(self):
+        return timezone.now() + timedelta(seconds=self.lease_seconds)
+
+    async def claim(self, **filters) -> Optional[Queue]:
+        """Atomically reserves the oldest claimable row matching filters
+
+        Returns:
+            Optional[Queue]: Claimed Queue instance, None if nothing is claimable
+        """
+        async with in_transaction() as connection:
+            candidate = (
+                await Queue.filter(claimable(), **filters)
+                .using_db(connection)
+                .select_for_update(skip_locked=True)
+                .order_by("created_at")
+                .first()
+            )
+            if candidate is None:
+                return None
+
+            claimed = (
+                await Queue.filter(claimable(), id=candidate.id)
+                .using_db(connection)
+                .update(
+                    status=IN_PROGRESS,
+                    claimed_by=self.worker_id,
+                    lease_expires_at=self._expiry(),
+                )
+            )
+        if not claimed:
+            return None
+
+        await candidate.refresh_from_db()
+        make_log(
+            "QUEUE_LEASE",
+            20,
+            "trainer_workflow.log",
+            f"Queue item {candidate.id} claimed by {self.worker_id}",
+        )
+        return candidate
+
+    async def renew(self, queue_item: Queue) -> bool:
+        """Extends the lease of a row this worker holds
+
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        renewed = await Queue.filter(
+            id=queue_item.id, status=IN_PROGRESS, claimed_by=self.worker_id
+        ).update(lease_expires_at=self._expiry())
+        if not renewed:
+            make_log(
+                "QUEUE_LEASE",
+                30,
+                "trainer_workflow.log",
+                f"Lease on queue item {queue_item.id} lost by {self.worker_id}",
+            )
+        return bool(renewed)
+
+    async def holds(self, queue_item: Queue) -> bool:
+        """Whether this worker still holds the row, i.e. nobody re-claimed it after a lapse"""
+        return await Queue.filter(
+            id=queue_item.id, status=IN_PROGRESS, claimed_by=self.worker_id
+        ).exists()
+
+    async def complete(self, queue_item: Queue) -> bool:
+        """Removes a finished row, only if this worker still holds it
+
+        Returns:
+            bool: False if the row was re-claimed by another worker and left alone
+        """
+        deleted = await Queue.filter(
+            id=queue_item.id, status=IN_PROGRESS, claimed_by=self.worker_id
+        ).delete()
+        return bool(deleted)
+
+    async def release(self, queue_item: Queue) -> None:
+        """Returns a held row to the queue without finishing it"""
+        await Queue.filter(
+            id=queue_item.id, status=IN_PROGRESS, claimed_by=self.worker_id
+        ).update(status=PENDING, claimed_by=None, lease_expires_at=None)
+
+    async def heartbeat(self, queue_item: Queue) -> None:
+        """Renews the lease every third of its length until cancelled or lost"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self.renew(queue_item):
+                return
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
+
+from database.models import ModelType, Queue, RequestSubscription, TrainedModel
+from model_core.work_signal import work_signal
+from utils.logger import make_log
+
+FRESHNESS_SECONDS = int(os.getenv("COALESCING_FRESHNESS_SECONDS", "3600"))
+
+TRAINED = "trained"
+ATTACHED = "attached"
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+
+
+@dataclass
+class EnqueueRequest:
+    user_id: int
+    asset_id: int
+    model_type: ModelType
+    priority: bool = False
+    # Idempotency key: a request whose key was already seen is dropped
+    request_key: Optional[str] = None
+
+
+def fingerprint(
+    asset_id: int,
+    model_type_id: int,
+    hyperparameters: Any,
+    data_version: Optional[str] = None,
+) -> str:
+    """Identifies requests that would train the exact same model
+
+    Args:
+        asset_id (int): Asset to train on
+        model_type_id (int): Model type to train
+        hyperparameters (Any): Hyperparameters, as a dict or its JSON string
+        data_version (Optional[str], optional): Last day of data the model would see. Defaults to today.
+
+    Returns:
+        str: Hex sha256 digest
+    """
+    if isinstance(hyperparameters, str):
+        hyperparameters = json.loads(hyperparameters)
+    if data_version is None:
+        data_version = timezone.now().strftime("%Y-%m-%d")
+    payload = json.dumps(
+        [asset_id, model_type_id, hyperparameters, data_version], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _subscribe(
+    request_key: Optional[str], **fields
+) -> Tuple[bool, RequestSubscription]:
+    """Creates a subscription unless a concurrent request stored the same key first
+
+    Returns:
+        Tuple[bool, RequestSubscription]: Whether it was created, and the subscription
+        holding the key
+    """
+    try:
+        return True, await RequestSubscription.create(request_key=request_key, **fields)
+    except IntegrityError:
+        existing = None
+        if request_key is not None:
+            existing = await RequestSubscription.filter(request_key=request_key).first()
+        if existing is None:
+            raise
+        return False, existing
+
+
+async def _raise_priority(queue_ids: List[int], using_db=None) -> None:
+    """Promotes jobs a priority user attached to, so they do not wait behind the FIFO"""
+    await Queue.filter(id__in=queue_ids, priority=False).using_db(using_db).update(
+        priority=True
+    )
+
+
+async def enqueue_request(
+    user_id: int,
+    asset_id: int,
+    model_type: ModelType,
+    priority: bool = False,
+    request_key: Optional[str] = None,
+) -> Tuple[str, int]:
+    """Enqueues a training request unless an identical one can serve it.
+
+    A fresh TrainedModel with the same fingerprint is handed out directly, and a
+    pending or in-progress Queue row with the same fingerprint gets the user
+    attached to it, promoting the job if the requester has priority. Every requester
+    gets a RequestSubscription, which the trainer fills in when the model is saved.
+    A request_key already stored on a subscription, even by a concurrent request,
+    means the request was received before and nothing is done.
+
+    Returns:
+        Tuple[str, int]: (TRAINED, trained model id), (ATTACHED, queue id),
+        (QUEUED, queue id) or (DUPLICATE, subscription id)
+    """
+    if request_key is not None:
+        existing = await RequestSubscription.filter(request_key=request_key).first()
+        if existing is not None:
+            return DUPLICATE, existing.id
+
+    request_fingerprint = fingerprint(
+        asset_id, model_type.id, model_type.default_hyperparameters
+    )
+
+    fresh_model = (
+        await TrainedModel.filter(
+            fingerprint=request_fingerprint,
+            training_timestamp__gte=timezone.now() - timedelta(seconds=FRESHNESS_SECONDS),
+        )
+        .order_by("-training_timestamp")
+        .only("id", "training_timestamp")
+        .first()
+    )
+    if fresh_model is not None:
+        created, subscription = await _subscribe(
+            request_key,
+            user_id=user_id,
+            fingerprint=request_fingerprint,
+            trained_model_id=fresh_model.id,
+            status="delivered",
+        )
+        if not created:
+            return DUPLICATE, subscription.id
+        return TRAINED, fresh_model.id
+
+    queue_item = await Queue.filter(fingerprint=request_fingerprint).first()
+    outcome = ATTACHED
+    if queue_item is None:
+        try:
+            queue_item = await Queue.create(
+                user_id=user_id,
+                asset_id=asset_id,
+                model_type_id=model_type.id,
+                priority=priority,
+                fingerprint=request_fingerprint,
+            )
+            outcome = QUEUED
+            work_signal.notify()
+        except IntegrityError:
+            # Another requester created the same job in the meantime
+            queue_item = await Queue.get(fingerprint=request_fingerprint)
+    if outcome == ATTACHED and priority:
+        await _raise_priority([queue_item.id])
+
+    created, subscription = await _subscribe(
+        request_key,
+        user_id=user_id,
+        fingerprint=request_fingerprint,
+        queue_id=queue_item.id,
+    )
+    if not created:
+        return DUPLICATE, subscription.id
+    make_log(
+        "REQUEST_COALESCING",
+        20,
+        "models_workflow.log",
+        f"Request from user {user_id} {outcome} on queue item {queue_item.id}",
+    )
+    return outcome, queue_item.id
+
+
+async def enqueue_requests(
+    requests: List[EnqueueRequest],
+) -> List[Tuple[str, Optional[int]]]:
+    """Batch version of enqueue_request, with a fixed number of queries per batch.
+
+    Fresh models and queued jobs are looked up for every fingerprint at once, new
+    jobs are bulk inserted (identical requests in the batch share one job, which is
+    a priority job if any of them is), existing jobs a priority requester attaches to
+    are promoted, and all subscriptions are created in one insert,
+    all inside a single transaction. Requests whose request_key was already stored,
+    or repeats one earlier in the batch, are dropped, which makes replaying a batch
+    free; the unique request_key column backs this up against concurrent writers.
+
+    Returns:
+        List[Tuple[str, Optional[int]]]: One (outcome, id) per request, in order, as
+        returned by enqueue_request. Duplicates within the batch have no id.
+    """
+    if not requests:
+        return []
+    results: List[Optional[Tuple[str, Optional[int]]]] = [None] * len(requests)
+
+    async with in_transaction() as connection:
+        keys = {r.request_key for r in requests if r.request_key is not None}
+        seen: Dict[str, Optional[int]] = {}
+        if keys:
+            seen.update(
+                await RequestSubscription.filter(request_key__in=keys)
+                .using_db(connection)
+                .values_list("request_key", "id")
+            )
+        pending = []  # (position, request, fingerprint)
+        for position, request in enumerate(requests):
+            if request.request_key is not None:
+                if request.request_key in seen:
+                    results[position] = (DUPLICATE, seen[request.request_key])
+                    continue
+                seen[request.request_key] = None
+            request_fingerprint = fingerprint(
+                request.asset_id,
+                request.model_type.id,
+                request.model_type.default_hyperparameters,
+            )
+            pending.append((position, request, request_fingerprint))
+
+        unique_fingerprints = {item[2] for item in pending}
+        fresh_models: Dict[str, int] = dict(
+            await TrainedModel.filter(
+                fingerprint__in=unique_fingerprints,
+                training_timestamp__gte=timezone.now() - timedelta(seconds=FRESHNESS_SECONDS),
+            )
+            .using_db(connection)
+            .order_by("training_timestamp")
+            .values_list("fingerprint", "id")
+        ) if unique_fingerprints else {}
+        queued: Dict[str, int] = dict(
+            await Queue.filter(fingerprint__in=unique_fingerprints - fresh_models.keys())
+            .using_db(connection)
+            .values_list("fingerprint", "id")
+        ) if unique_fingerprints else {}
+
+        new_jobs: Dict[str, Queue] = {}
+        for _, request, request_fingerprint in pending:
+            if request_fingerprint in fresh_models or request_fingerprint in queued:
+                continue
+            job = new_jobs.get(request_fingerprint)
+            if job is None:
+                new_jobs[request_fingerprint] = Queue(
+                    user_id=request.user_id,
+                    asset_id=request.asset_id,
+                    model_type_id=request.model_type.id,
+                    priority=request.priority,
+                    fingerprint=request_fingerprint,
+                )
+            elif request.priority:
+                job.priority = True
+        if new_jobs:
+            # Rows a concurrent requester inserted first are kept and attached to
+            await Queue.bulk_create(
+                list(new_jobs.values()), ignore_conflicts=True, using_db=connection
+            )
+            queued.update(
+                await Queue.filter(fingerprint__in=new_jobs.keys())
+                .using_db(connection)
+                .values_list("fingerprint", "id")
+            )
+            # INSERT IGNORE also swallows foreign key violations, e.g. an unknown asset
+            missing = new_jobs.keys() - queued.keys()
+            if missing:
+                raise IntegrityError(
+                    f"Queue rows were not inserted for {len(missing)} requests, "
+                    f"first asset {new_jobs[next(iter(missing))].asset_id}"
+                )
+
+        # Jobs that existed before this batch and now have a priority requester
+        promoted = {
+            queued[request_fingerprint]
+            for _, request, request_fingerprint in pending
+            if request.priority
+            and request_fingerprint in queued
+            and request_fingerprint not in new_jobs
+        }
+        if promoted:
+            await _raise_priority(list(promoted), using_db=connection)
+
+        subscriptions = []
+        creators = set()
+        for position, request, request_fingerprint in pending:
+            if request_fingerprint in fresh_models:
+                results[position] = (TRAINED, fresh_models[request_fingerprint])
+                subscription = RequestSubscription(
+                    user_id=request.user_id,
+                    fingerprint=request_fingerprint,
+                    trained_model_id=fresh_models[request_fingerprint],
+                    status="delivered",
+                    request_key=request.request_key,
+                )
+            else:
+                is_creator = (
+                    request_fingerprint in new_jobs
+                    and request_fingerprint not in creators
+                )
+                creators.add(request_fingerprint)
+                results[position] = (
+                    QUEUED if is_creator else ATTACHED,
+                    queued[request_fingerprint],
+                )
+                subscription = RequestSubscription(
+                    user_id=request.user_id,
+                    fingerprint=request_fingerprint,
+                    queue_id=queued[request_fingerprint],
+                    request_key=request.request_key,
+                )
+            subscriptions.append(subscription)
+        if subscriptions:
+            await RequestSubscription.bulk_create(
+                subscriptions, ignore_conflicts=True, using_db=connection
+            )
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    if outcomes[QUEUED]:
+        work_signal.notify()
+    make_log(
+        "REQUEST_COALESCING",
+        20,
+        "models_workflow.log",
+        f"Batch of {len(requests)} requests: {dict(outcomes)}",
+    )
+    return results
+
+
+async def deliver(queue_item: Queue, trained_model: TrainedModel) -> int:
+    """Fans a trained model out to every user subscribed to the queue item
+
+    Returns:
+        int: Number of subscriptions delivered
+    """
+    return await RequestSubscription.filter(queue_id=queue_item.id).update(
+        trained_model_id=trained_model.id, status="delivered"
+    )
+
+
+async def fail(queue_item: Queue) -> int:
+    return await RequestSubscription.filter(queue_id=queue_item.id).update(
+        status="failed"
+    )
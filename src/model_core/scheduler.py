@@ -0,0 +1,187 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tortoise import timezone
+from tortoise.functions import Count
+
+from database.models import Queue, User
+from model_core.cost_model import cost_model
+from model_core.queue_lease import IN_PROGRESS, QueueLease, claimable
+from utils.logger import make_log
+
+SCAN_LIMIT = int(os.getenv("SCHEDULER_SCAN_LIMIT", "200"))
+PRIORITY_WEIGHT = float(os.getenv("SCHEDULER_PRIORITY_WEIGHT", "5"))
+TOKENS_PER_WEIGHT = int(os.getenv("SCHEDULER_TOKENS_PER_WEIGHT", "100"))
+BASE_CONCURRENCY = int(os.getenv("SCHEDULER_BASE_CONCURRENCY", "1"))
+TOKENS_PER_SLOT = int(os.getenv("SCHEDULER_TOKENS_PER_SLOT", "100"))
+MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "4"))
+AGING_SECONDS = float(os.getenv("SCHEDULER_AGING_SECONDS", "600"))
+SHORTEST_JOB_FIRST = os.getenv("SCHEDULER_SJF", "0") == "1"
+CLAIM_ATTEMPTS = 3
+
+CostEstimator = Callable[[Queue], float]
+
+
+def unit_cost(queue_item: Queue) -> float:
+    return 1.0
+
+
+class Scheduler(ABC):
+    """Decides which claimable Queue row a trainer takes next"""
+
+    @abstractmethod
+    async def select(self, exclude: Optional[int] = None) -> Optional[Queue]:
+        """Returns the row that would run next without claiming it or changing any state"""
+        pass
+
+    def on_claimed(self, queue_item: Queue) -> None:
+        """Called once the selected row has been claimed by this trainer"""
+        pass
+
+    async def next(self, lease: QueueLease) -> Optional[Queue]:
+        """Selects and claims the next row, retrying when another worker wins the race
+
+        Returns:
+            Optional[Queue]: Claimed Queue instance with its user fetched
+        """
+        for _ in range(CLAIM_ATTEMPTS):
+            candidate = await self.select()
+            if candidate is None:
+                return None
+            queue_item = await lease.claim(id=candidate.id)
+            if queue_item is not None:
+                queue_item.user = candidate.user
+                self.on_claimed(queue_item)
+                return queue_item
+        return None
+
+
+class FifoScheduler(Scheduler):
+    """Oldest claimable row first, priority or not"""
+
+    async def select(self, exclude: Optional[int] = None) -> Optional[Queue]:
+        query = Queue.filter(claimable())
+        if exclude is not None:
+            query = query.exclude(id=exclude)
+        return await query.order_by("created_at").select_related("user").first()
+
+
+class FairShareScheduler(Scheduler):
+    """Weighted fair queuing across users.
+
+    Every user has a virtual finish time that grows by cost / weight each time one of
+    their requests is claimed, and the candidate with the smallest finish time runs
+    next. Weights grow with User.tokens and with the request priority flag, so paying
+    and priority users get a larger share without locking anybody else out. Waiting
+    lowers a request's tag by one unit of cost every aging_seconds, so old requests
+    always rise to the front, and users already running their max_concurrency jobs
+    are skipped while somebody else has work waiting. The scheduler is work-conserving:
+    when every candidate's owner is at their cap, the oldest candidate runs anyway
+    rather than leaving workers idle. With shortest_job_first the estimated cost of each request is used
+    instead of a unit cost, so cheap jobs go first among users with equal share.
+
+    Virtual times live in the trainer process; they only order the candidates, the
+    claim itself still goes through the lease so several workers stay consistent.
+    """
+
+    def __init__(
+        self,
+        cost_estimator: CostEstimator = unit_cost,
+        shortest_job_first: bool = SHORTEST_JOB_FIRST,
+        aging_seconds: float = AGING_SECONDS,
+        scan_limit: int = SCAN_LIMIT,
+    ):
+        self.cost_estimator = cost_estimator
+        self.shortest_job_first = shortest_job_first
+        self.aging_seconds = aging_seconds
+        self.scan_limit = scan_limit
+        self.virtual_time = 0.0
+        self._finish: Dict[int, float] = {}
+
+    def weight(self, queue_item: Queue) -> float:
+        weight = 1 + queue_item.user.tokens / TOKENS_PER_WEIGHT
+        if queue_item.priority:
+            weight *= PRIORITY_WEIGHT
+        return weight
+
+    def max_concurrency(self, user: User) -> int:
+        return min(BASE_CONCURRENCY + user.tokens // TOKENS_PER_SLOT, MAX_CONCURRENCY)
+
+    def cost(self, queue_item: Queue) -> float:
+        if self.shortest_job_first:
+            return max(self.cost_estimator(queue_item), 1e-6)
+        return 1.0
+
+    def _tags(self, queue_item: Queue) -> Tuple[float, float]:
+        """Virtual start and finish tags of a candidate, before aging"""
+        start = max(self.virtual_time, self._finish.get(queue_item.user_id, 0.0))
+        return start, start + self.cost(queue_item) / self.weight(queue_item)
+
+    def _score(self, queue_item: Queue, now: datetime) -> float:
+        _, finish = self._tags(queue_item)
+        waited = (now - queue_item.created_at).total_seconds()
+        return finish - waited / self.aging_seconds
+
+    async def _running_per_user(self) -> Dict[int, int]:
+        rows = (
+            await Queue.filter(
+                status=IN_PROGRESS, lease_expires_at__gte=timezone.now()
+            )
+            .annotate(running=Count("id"))
+            .group_by("user_id")
+            .values("user_id", "running")
+        )
+        return {row["user_id"]: row["running"] for row in rows}
+
+    async def _candidates(self, exclude: Optional[int]) -> List[Queue]:
+        query = Queue.filter(claimable())
+        if exclude is not None:
+            query = query.exclude(id=exclude)
+        # Served by the (status, priority, created_at) index
+        return await (
+            query.order_by("created_at").limit(self.scan_limit).select_related("user")
+        )
+
+    async def select(self, exclude: Optional[int] = None) -> Optional[Queue]:
+        if self.shortest_job_first:
+            await cost_model.refresh()
+        candidates = await self._candidates(exclude)
+        if not candidates:
+            return None
+        running = await self._running_per_user()
+        now = timezone.now()
+
+        best, best_score = None, None
+        for queue_item in candidates:
+            if running.get(queue_item.user_id, 0) >= self.max_concurrency(queue_item.user):
+                continue
+            score = self._score(queue_item, now)
+            if best_score is None or score < best_score:
+                best, best_score = queue_item, score
+        # Caps only share workers between users; nobody else is waiting for them
+        return best if best is not None else candidates[0]
+
+    def on_claimed(self, queue_item: Queue) -> None:
+        start, finish = self._tags(queue_item)
+        self.virtual_time = start
+        self._finish[queue_item.user_id] = finish
+        make_log(
+            "SCHEDULER",
+            20,
+            "trainer_workflow.log",
+            f"Scheduled queue item {queue_item.id} for user {queue_item.user_id} (finish tag {finish:.3f})",
+        )
+
+
+SCHEDULERS: Dict[str, type] = {
+    "fair_share": FairShareScheduler,
+    "fifo": FifoScheduler,
+}
+
+
+def get_scheduler(name: str = os.getenv("TRAINER_SCHEDULER", "fair_share"), **kwargs) -> Scheduler:
+    if name == "fair_share":
+        kwargs.setdefault("cost_estimator", cost_model.estimate)
+    return SCHEDULERS[name](**kwargs)
@@ -1,52 +1,136 @@
+import asyncio
+
 from tortoise.exceptions import IncompleteInstanceError, IntegrityError
 
 from database.models import Queue, FailedQueue
 from model_core.trainer import Trainer
 from model_core.failed_requests_trainer import FailedRequestsTrainer
+from model_core import request_coalescing, forecasting
+from model_core.work_signal import IdleBackoff, work_signal
 from utils.logger import make_log
 
 
 async def service_loop() -> None:
     trainer = Trainer()
+    backoff = IdleBackoff()
+    work_signal.start_listening()
     while True:
         try:
-            trainer.train()
+            await trainer.train()
             make_log(
                 "TRAINER_SERVICE",
                 20,
                 "trainer_service.log",
                 f"Training current request...",
             )
-        except TypeError as e:
+            backoff.reset()
+            await finish_request(trainer)
+        except Exception as e:
+            if trainer.current_request is None:
+                if not isinstance(e, TypeError):
+                    make_log(
+                        "TRAINER_SERVICE",
+                        40,
+                        "trainer_service.log",
+                        f"Could not claim a request: {str(e)}",
+                    )
+                # Queue is empty or unreachable: sleep until an enqueue signals or the backoff expires
+                await work_signal.wait(backoff.next())
+                continue
             make_log(
                 "TRAINER_SERVICE",
                 40,
                 "trainer_service.log",
-                f"Failed at request: {trainer.current_request.id}. Trainer train method error: {str(e)}. Skipping request.",
+                f"Failed at request: {trainer.current_request.id}. Trainer error: {str(e)}. Skipping request.",
             )
-            manage_failed_request(trainer.current_request)
-            continue
-        trainer.evaluate()
-        make_log(
-            "TRAINER_SERVICE",
-            20,
-            "trainer_service.log",
-            f"Performing evaluation metrics...",
-        )
-        model = trainer.save_model()
+            await fail_request(trainer)
+
+
+async def finish_request(trainer: Trainer) -> None:
+    """Evaluates and saves the model trained for the current request, delivers it to
+    the request's subscribers and removes the request from the queue"""
+    # Evaluation runs in a worker thread so the lease heartbeat keeps running
+    await asyncio.get_running_loop().run_in_executor(None, trainer.evaluate)
+    make_log(
+        "TRAINER_SERVICE",
+        20,
+        "trainer_service.log",
+        f"Performing evaluation metrics...",
+    )
+    if await lost_lease(trainer):
+        return
+    model = await trainer.save_model()
+    make_log(
+        "TRAINER_SERVICE",
+        20,
+        "trainer_service.log",
+        f"Saving model to database...",
+    )
+    if model is None:
         make_log(
             "TRAINER_SERVICE",
-            20,
+            30,
             "trainer_service.log",
-            f"Saving model to database...",
+            "Error saving model, continuing with service...",
         )
-        if model is None:
+    else:
+        await request_coalescing.deliver(trainer.current_request, model)
+        try:
+            await forecasting.save_forecast(
+                model,
+                trainer.current_trained_model,
+                trainer.current_request.asset.ticker,
+            )
+        except Exception as e:
             make_log(
                 "TRAINER_SERVICE",
                 30,
                 "trainer_service.log",
-                "Error saving model, continuing with service...",
+                f"Forecast for model {model.id} could not be computed: {str(e)}",
             )
+    if not await trainer.lease.complete(trainer.current_request):
+        make_log(
+            "TRAINER_SERVICE",
+            30,
+            "trainer_service.log",
+            f"Request {trainer.current_request.id} was re-claimed before it could be removed",
+        )
+    trainer.stop_heartbeat()
+
+
+async def fail_request(trainer: Trainer) -> None:
+    """Fails the subscriptions of the current request and moves it to the failed
+    queue, unless another worker holds it by now. If that also fails, the request is
+    left to its lease, which lapses without the heartbeat so another worker retries it"""
+    try:
+        if await lost_lease(trainer):
+            return
+        await request_coalescing.fail(trainer.current_request)
+        await manage_failed_request(trainer.current_request)
+    except Exception as e:
+        make_log(
+            "TRAINER_SERVICE",
+            40,
+            "trainer_service.log",
+            f"Request {trainer.current_request.id} could not be marked as failed: {str(e)}",
+        )
+    finally:
+        trainer.stop_heartbeat()
+
+
+async def lost_lease(trainer: Trainer) -> bool:
+    """Drops the current request if another worker re-claimed it after this worker's
+    lease lapsed, so the job is neither saved twice nor removed under its new holder"""
+    if await trainer.lease.holds(trainer.current_request):
+        return False
+    make_log(
+        "TRAINER_SERVICE",
+        30,
+        "trainer_service.log",
+        f"Lease on request {trainer.current_request.id} lost, dropping its result",
+    )
+    trainer.stop_heartbeat()
+    return True
 
 
 async def check_failed_requests() -> None:
@@ -64,7 +148,7 @@ async def check_failed_requests() -> None:
                 "Failed requests table is empty, stopping...", )
             break
         try:
-            trainer.train()
+            await trainer.train()
             make_log(
                 "FAILED_REQUESTS_SERVICE", 20, "trainer_service.log"
                 "Re-training previously failed request...", )
@@ -75,7 +159,7 @@ async def check_failed_requests() -> None:
                 "trainer_service.log",
                 f"Failed at request: {trainer.current_request.id}. Trainer train method error: {str(e)}. Skipping request.",
             )
-            manage_failed_request(trainer.current_request)
+            await manage_failed_request(trainer.current_request)
             continue
         trainer.evaluate()
         make_log(
@@ -83,7 +167,7 @@ async def check_failed_requests() -> None:
             20,
             "trainer_service.log" "Performing evaluation metrics...",
         )
-        model = trainer.save_model()
+        model = await trainer.save_model()
         make_log(
             "FAILED_REQUESTS_SERVICE",
             20,
@@ -96,6 +180,8 @@ async def check_failed_requests() -> None:
                 "trainer_error.log",
                 "Error saving model, continuing with service...",
             )
+        else:
+            await trainer.current_request.delete()
     make_log(
         "FAILED_REQUESTS_SERVICE",
         20,
@@ -112,11 +198,12 @@ async def manage_failed_request(request: Queue) -> None:
         f"Managing failed request, REQUEST: {request.id}, {request.user_id}, {request.asset_id}, {request.model_type_id}",
     )
     try:
-        await FailedQueue.save(
+        await FailedQueue.create(
             asset_id=request.asset_id,
             model_type_id=request.model_type_id,
             user_id=request.user_id,
         )
+        await request.delete()
     except (IncompleteInstanceError, IntegrityError) as e:
         make_log(
             "TRAINER_SERVICE",
@@ -1,13 +1,25 @@
-import aiofiles
+import asyncio
 import json
-import os
+import time
 import tensorflow as tf
 from keras.callbacks import History
 from typing import Optional, ByteString
 
 from model_core.model_builders.model_base import ModelBase
 from model_core.model_utils.model_factory import ModelFactory
-from database.models import TrainedModel, ModelType, Queue
+from model_core.model_utils.window_prefetcher import WindowPrefetcher
+from model_core.model_utils.model_serializer import serialize_model, deserialize_model
+from model_core.queue_lease import QueueLease
+from model_core.scheduler import Scheduler, get_scheduler
+from model_core.model_utils.window_pipeline import (
+    data_processing,
+    incremental_data_processing,
+)
+from model_core import warm_start, hyperparameter_search
+from model_core.cost_model import cost_model
+from database.models import TrainedModel, ModelType, Queue, HyperparameterTrial
+from database.artifact_store import get_artifact_store, read_serialized_model
+from kafka.services import publish_model_trained
 from utils.logger import make_log
 
 
@@ -16,25 +28,27 @@ class Trainer:
         self.val_performance = {}
         self.performance = {}
         self.current_request: Queue = None  # Queue Instance
-        self.priority_counter = 0
         self.current_model_instance: ModelBase = None  # Model Builder Instance
         self.current_trained_model = None  # Keras Model
+        self.prefetcher = WindowPrefetcher()
+        self.lease = QueueLease()
+        self.scheduler: Scheduler = get_scheduler()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.warm_started = False
+        self.search_result: Optional[hyperparameter_search.SearchResult] = None
 
     async def _get_next_queue_item(self) -> Optional[Queue]:
-        """Uses self.priority_counter to retrieve the next priority or non-priority item from the queue
+        """Asks self.scheduler for the next item and claims it from the queue
 
         Returns:
-            Optional[Queue]: Queue instance
+            Optional[Queue]: Queue instance, leased to this trainer
         """
 
-        queue_item = (
-            await Queue.filter(priority=1 if self.priority_counter < 5 else 0)
-            .order_by("created_at")
-            .first()
-        )
+        queue_item = await self.scheduler.next(self.lease)
 
         if queue_item:
-            self._manage_prio_counter(queue_item.priority)
+            self._heartbeat = asyncio.create_task(
+                self.lease.heartbeat(queue_item))
             make_log(
                 "TRAINER",
                 20,
@@ -45,27 +59,42 @@ class Trainer:
         else:
             make_log(
                 "TRAINER",
-                30,
+                10,
                 "trainer_workflow.log",
                 f"No queue item found: {queue_item}",
             )
             return None
 
-    def _manage_prio_counter(self, queue_item_priority: int) -> None:
-        """Keeps track of completed priority requests and manages self.priority_counter
+    async def _peek_next_queue_item(self) -> Optional[Queue]:
+        """Returns the item _get_next_queue_item would pick after the current request,
+        without consuming it or touching the scheduler state
 
-        Args:
-            queue_item_priority (int): Queue item instance priority field
+        Returns:
+            Optional[Queue]: Queue instance with its asset fetched
         """
-        if queue_item_priority == 1:
-            self.priority_counter += 1
-        else:
-            self.priority_counter = 0
-        make_log(
-            "TRAINER",
-            20,
-            "trainer_workflow.log",
-            f"Queue priority counter adjusted: {self.priority_counter}",
+        exclude = self.current_request.id if self.current_request is not None else None
+        next_item = await self.scheduler.select(exclude=exclude)
+        if next_item is not None:
+            await next_item.fetch_related("asset")
+        return next_item
+
+    async def _prefetch_next_window(self) -> None:
+        """Starts preparing the next request's data window while the current one trains"""
+        next_item = await self._peek_next_queue_item()
+        if next_item is not None:
+            self.prefetcher.schedule(next_item.id, next_item.asset.ticker)
+
+    def stop_heartbeat(self) -> None:
+        """Stops renewing the lease of the current request once it is finished"""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def _compile(self, model) -> None:
+        model.compile(
+            loss=tf.losses.MeanSquaredError(),
+            optimizer=tf.optimizers.Adam(),
+            metrics=[tf.metrics.MeanAbsoluteError()],
         )
 
     def _compile_and_fit(
@@ -88,11 +117,7 @@ class Trainer:
         early_stopping = tf.keras.callbacks.EarlyStopping(
             monitor="val_loss", patience=patience, mode="min"
         )
-        model.compile(
-            loss=tf.losses.MeanSquaredError(),
-            optimizer=tf.optimizers.Adam(),
-            metrics=[tf.metrics.MeanAbsoluteError()],
-        )
+        self._compile(model)
         history = model.fit(
             window.train,
             epochs=epochs,
@@ -114,18 +139,28 @@ class Trainer:
             TypeError: Raised if no queue item could be retrieved
             TypeError: Raised if factory could not return any model instance
         """
-        self.current_request = self._get_next_queue_item()
+        self.current_request = await self._get_next_queue_item()
         if self.current_request is None:
             queue_error = "Cannot retrieve queue item"
             make_log(
                 "TRAINER",
-                40,
+                10,
                 "trainer_workflow.log",
                 queue_error,
             )
             raise TypeError(queue_error)  # Caught in service module
-        built_model = ModelFactory.get_built_model(
-            self.current_request.model_type, self.current_request.asset
+        await self.current_request.fetch_related("asset")
+        window = await self.prefetcher.take(self.current_request.id)
+        await self._prefetch_next_window()
+        if window is None:
+            # Not prefetched or the prefetch failed; still keep the heartbeat running
+            window = await asyncio.get_running_loop().run_in_executor(
+                None, data_processing, self.current_request.asset.ticker)
+
+        built_model = await ModelFactory.get_built_model(
+            self.current_request.model_type_id,
+            asset=self.current_request.asset.ticker,
+            window=window,
         )
         if not built_model:
             model_error = "Could not retrieve model instance from model factory"
@@ -137,14 +172,128 @@ class Trainer:
             )
             raise TypeError(model_error)  # Caught in service module
         self.current_model_instance = built_model
-        self.current_trained_model = self._compile_and_fit(
-            self.current_model_instance.model, self.current_model_instance.window)
+        self.warm_started = warm_start.WARM_START and await self._warm_start(built_model)
+        self.search_result = None
+        loop = asyncio.get_running_loop()
+        history = None
+        fit_started = time.perf_counter()
+        # Fit and search run in a worker thread so the lease heartbeat keeps running
+        if not self.warm_started and hyperparameter_search.SEARCH:
+            self.search_result = await loop.run_in_executor(
+                None,
+                hyperparameter_search.run_search,
+                type(built_model),
+                built_model.window,
+            )
+        if self.search_result is not None:
+            self.current_model_instance = self._apply_search_result(
+                built_model, self.search_result)
+        else:
+            history = await loop.run_in_executor(
+                None,
+                self._compile_and_fit,
+                self.current_model_instance.model,
+                self.current_model_instance.window,
+                warm_start.EPOCHS if self.warm_started else 20,
+            )
+        self.current_trained_model = self.current_model_instance.model
+        await cost_model.record(
+            self.current_request,
+            self.current_model_instance.window,
+            self.current_model_instance.to_dict()["default_hyperparameters"],
+            time.perf_counter() - fit_started,
+            len(history.epoch) if history is not None else None,
+            self.warm_started,
+            self.search_result is not None,
+        )
         make_log(
             "TRAINER",
             20,
             "trainer_workflow.log",
             "Model successfully built")
 
+    def _apply_search_result(
+        self,
+        built_model: ModelBase,
+        result: hyperparameter_search.SearchResult,
+    ) -> ModelBase:
+        """Rebuilds the model with the winning hyperparameters and its trained weights
+
+        Args:
+            built_model (ModelBase): Model builder instance built with default hyperparameters
+            result (SearchResult): Finished hyperparameter search
+
+        Returns:
+            ModelBase: Model builder instance holding the search winner
+        """
+        window = built_model.window
+        winner = type(built_model)(
+            asset=None, window=window, **result.hyperparameters)
+        winner.model.build(
+            (None, window.input_width, len(window.column_indices)))
+        winner.model.set_weights(result.weights)
+        self._compile(winner.model)
+        return winner
+
+    async def _warm_start(self, built_model: ModelBase) -> bool:
+        """Swaps the freshly built model for the latest TrainedModel of the asset and
+        model type, and its window for one over the bars it has not seen yet plus a
+        replay slice. The current model instance is rebuilt with the previous
+        model's hyperparameters, which a search may have chosen, so they are the
+        ones saved with the fine-tuned model
+
+        Args:
+            built_model (ModelBase): Model builder instance of the current request
+
+        Returns:
+            bool: False if no compatible model exists or the data drifted, in which
+            case the current model instance is left as built_model for a full training
+        """
+        previous = await warm_start.find_warm_start_model(
+            self.current_request.asset_id,
+            self.current_request.model_type_id,
+        )
+        if previous is None or not previous.normalization:
+            return False
+
+        serialized_model = await read_serialized_model(previous)
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(
+            None, self._deserialize_model, serialized_model)
+        window = await loop.run_in_executor(
+            None,
+            incremental_data_processing,
+            self.current_request.asset.ticker,
+            previous.training_timestamp,
+            warm_start.REPLAY_BARS,
+            warm_start.VAL_BARS,
+            previous.normalization,
+        )
+        if (
+            window is None
+            or not warm_start.is_compatible(model, window)
+            or await warm_start.has_drifted(model, window, previous)
+        ):
+            make_log(
+                "TRAINER",
+                20,
+                "trainer_workflow.log",
+                f"Model {previous.id} not usable for warm start, training from scratch",
+            )
+            return False
+
+        warm_model = type(built_model)(
+            asset=None, window=window, **warm_start.hyperparameters_of(previous))
+        warm_model.model = model
+        self.current_model_instance = warm_model
+        make_log(
+            "TRAINER",
+            20,
+            "trainer_workflow.log",
+            f"Warm starting from model {previous.id}",
+        )
+        return True
+
     def evaluate(self) -> None:
         """Stores performance metrics of current trained model"""
         self.val_performance = self.current_trained_model.evaluate(
@@ -166,20 +315,23 @@ class Trainer:
             Optional[TrainedModel]: TrainedModel instance
         """
         model_dict = self.current_model_instance.to_dict()
-        self._save_new_model_type(model_dict)
-        serialized_model = self._serialize_model()
+        await self._save_new_model_type(model_dict)
+        artifact = await get_artifact_store().put(self._serialize_model())
 
         model = await TrainedModel.create(
-            model_type=self.current_model_instance,
-            asset=self.current_request.asset,
-            user=self.current_request.user,
+            model_type_id=self.current_request.model_type_id,
+            asset_id=self.current_request.asset_id,
+            user_id=self.current_request.user_id,
             model_name=model_dict["model_name"],
             performance_metrics=json.dumps(self.performance),
             hyperparameters=model_dict["default_hyperparameters"],
             model_architecture=model_dict["default_model_architecture"],
-            serialized_model=serialized_model,
-            training_logs=json.dumps(self.val_performance),
+            artifact_key=artifact.key,
+            artifact_size=artifact.size,
+            training_performance=json.dumps(self.val_performance),
             status="Temporal",
+            fingerprint=getattr(self.current_request, "fingerprint", None),
+            normalization=self.current_model_instance.window.normalization,
         )
         if model is None:
             make_log(
@@ -189,11 +341,22 @@ class Trainer:
                 f"Error saving model",
             )
             return None
+        if self.search_result is not None:
+            await self._save_search_trials(model)
         make_log(
             "TRAINER",
             20,
             "trainer_workflow.log",
             "Model successfully saved")
+        try:
+            publish_model_trained(model, self.current_request.asset.ticker)
+        except Exception as e:
+            make_log(
+                "TRAINER",
+                30,
+                "trainer_workflow.log",
+                f"Model trained event not published: {str(e)}",
+            )
         return model
 
     # async def save_temp_model(self) -> Optional[TempModel]:
@@ -222,24 +385,52 @@ class Trainer:
     #         return None
     #     return model
 
-    async def _serialize_model(self) -> ByteString:
-        """Serializes current trained model
+    def _serialize_model(self) -> ByteString:
+        """Serializes current trained model in memory
 
         Returns:
             ByteString: ByteString containing Binary serialized model
         """
-        save_path = os.getenv("TRAINED_MODEL_SAVE_PATH")
-        self.current_trained_model.save(save_path)
-        async with aiofiles.open(save_path, "rb") as file:
-            serialized_model = await file.read()
-        os.remove(save_path)
+        serialized_model = serialize_model(self.current_trained_model)
         make_log(
             "TRAINER",
             20,
             "trainer_workflow.log",
-            "Model successfully serialized")
+            f"Model successfully serialized ({len(serialized_model)} bytes)")
         return serialized_model
 
+    async def _save_search_trials(self, model: TrainedModel) -> None:
+        """Stores the trial table of the search that produced model"""
+        await HyperparameterTrial.bulk_create(
+            [
+                HyperparameterTrial(
+                    search_id=self.search_result.search_id,
+                    asset_id=self.current_request.asset_id,
+                    model_type_id=self.current_request.model_type_id,
+                    trained_model_id=model.id,
+                    hyperparameters=trial.hyperparameters,
+                    rung=trial.rung,
+                    epochs=trial.epochs,
+                    val_loss=trial.val_loss,
+                    pruned=trial.pruned,
+                )
+                for trial in self.search_result.trials
+            ]
+        )
+
+    def _deserialize_model(self, serialized_model: ByteString) -> tf.keras.Model:
+        """Rebuilds a Keras model from the bytes produced by _serialize_model
+
+        Args:
+            serialized_model (ByteString): Binary serialized model
+
+        Returns:
+            tf.keras.Model: Compiled Keras model
+        """
+        model = deserialize_model(serialized_model)
+        self._compile(model)
+        return model
+
     async def _save_new_model_type(self, model_dict) -> None:
         """Checks if model type of current trained model does not exist and creates it otherwise
 
@@ -255,7 +446,7 @@ class Trainer:
 
         if not model_type_exists:
             new_model = await ModelType.create(
-                name=model_dict["model_name"],
+                model_name=model_dict["model_name"],
                 description=model_dict["description"],
                 default_hyperparameters=model_dict["default_hyperparameters"],
                 default_model_architecture=model_dict["default_model_architecture"],
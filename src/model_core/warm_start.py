@@ -0,0 +1,75 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, Optional
+
+from database.models import TrainedModel
+from model_core.model_utils.window_generator import WindowGenerator
+from utils.logger import make_log
+
+WARM_START = os.getenv("WARM_START", "1") == "1"
+REPLAY_BARS = int(os.getenv("WARM_START_REPLAY_BARS", "250"))
+# Most recent bars the fine-tuned model is validated on, at least 31 to window
+VAL_BARS = int(os.getenv("WARM_START_VAL_BARS", "60"))
+EPOCHS = int(os.getenv("WARM_START_EPOCHS", "5"))
+# Fine-tuning is abandoned when the previous model's validation loss on the new
+# bars is worse than DRIFT_TOLERANCE times the loss it was originally saved with
+DRIFT_TOLERANCE = float(os.getenv("WARM_START_DRIFT_TOLERANCE", "2.0"))
+
+
+def _loads(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+async def find_warm_start_model(
+    asset_id: int, model_type_id: int
+) -> Optional[TrainedModel]:
+    """Returns the latest TrainedModel for the same asset and model type, whatever
+    hyperparameters it was trained with, searched ones included
+
+    Args:
+        asset_id (int): Asset of the current request
+        model_type_id (int): Model type of the current request
+
+    Returns:
+        Optional[TrainedModel]: Full TrainedModel instance, None if there is none
+    """
+    return (
+        await TrainedModel.filter(asset_id=asset_id, model_type_id=model_type_id)
+        .order_by("-training_timestamp", "-id")
+        .first()
+    )
+
+
+def hyperparameters_of(previous: TrainedModel) -> Dict[str, Any]:
+    """Stored hyperparameters of a TrainedModel, as builder keyword arguments"""
+    return _loads(previous.hyperparameters) or {}
+
+
+def is_compatible(model, window: WindowGenerator) -> bool:
+    return model.input_shape[-1] == len(window.column_indices)
+
+
+async def has_drifted(model, window: WindowGenerator, previous: TrainedModel) -> bool:
+    """Compares the previous model's loss on the latest bars against its saved val loss.
+    The evaluation runs in a worker thread so the lease heartbeat keeps running"""
+    reference = _loads(previous.training_performance)
+    if isinstance(reference, list):
+        reference = reference[0]
+    if not reference:
+        return True
+
+    loss = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: model.evaluate(window.val, verbose=0)
+    )
+    if isinstance(loss, list):
+        loss = loss[0]
+
+    drifted = loss > reference * DRIFT_TOLERANCE
+    make_log(
+        "WARM_START",
+        20,
+        "trainer_workflow.log",
+        f"Model {previous.id} val loss {loss:.5f} vs saved {reference:.5f}, drifted: {drifted}",
+    )
+    return drifted
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import threading
+from typing import Optional
+
+from confluent_kafka import OFFSET_END, Consumer, KafkaException, Producer, TopicPartition
+
+from utils.logger import make_log
+
+IDLE_MIN_SECONDS = float(os.getenv("TRAINER_IDLE_MIN_SECONDS", "1"))
+# Short enough that a lost or unconfigured signal only delays pickup by seconds
+IDLE_MAX_SECONDS = float(os.getenv("TRAINER_IDLE_MAX_SECONDS", "5"))
+
+
+class IdleBackoff:
+    """Exponential wait between empty polls, reset as soon as work shows up"""
+
+    def __init__(
+        self, min_seconds: float = IDLE_MIN_SECONDS, max_seconds: float = IDLE_MAX_SECONDS
+    ):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.current = min_seconds
+
+    def next(self) -> float:
+        delay = self.current
+        self.current = min(self.current * 2, self.max_seconds)
+        return delay
+
+    def reset(self) -> None:
+        self.current = self.min_seconds
+
+
+class WorkSignal:
+    """Wakes idle trainers when a request is enqueued.
+
+    Inside one process notify() just sets an asyncio.Event. When WORK_AVAILABLE_TOPIC
+    is set it also publishes an empty message there, and every trainer process reads
+    all partitions of the topic without a consumer group, so the API and the Kafka
+    consumer can wake trainers running elsewhere. Trainers still wake up on their
+    idle backoff, so a lost signal or an expired lease only delays pickup.
+    """
+
+    def __init__(self, topic: Optional[str] = None):
+        self._topic = topic
+        self._event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._producer: Optional[Producer] = None
+        self._listener: Optional[threading.Thread] = None
+
+    @property
+    def topic(self) -> Optional[str]:
+        # Read on use, so a .env loaded after this module was imported still applies
+        return self._topic or os.getenv("WORK_AVAILABLE_TOPIC")
+
+    def _local_event(self) -> asyncio.Event:
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+        return self._event
+
+    def _publish(self) -> None:
+        try:
+            if self._producer is None:
+                self._producer = Producer(
+                    {"bootstrap.servers": os.getenv("KAFKA_BOOTSTRAP_SERVER")}
+                )
+            self._producer.produce(self.topic, value=b"")
+            self._producer.poll(0)
+        except (KafkaException, BufferError) as e:
+            make_log(
+                "WORK_SIGNAL",
+                30,
+                "trainer_workflow.log",
+                f"Could not publish work signal: {str(e)}",
+            )
+
+    def notify(self) -> None:
+        """Signals that new work is available, to this process and to remote trainers"""
+        if self._event is not None:
+            self._loop.call_soon_threadsafe(self._event.set)
+        if self.topic:
+            self._publish()
+
+    def _listen(self) -> None:
+        # No consumer group: every trainer reads every partition from the end, and
+        # restarts do not leave groups behind on the broker
+        consumer = Consumer(
+            {
+                "bootstrap.servers": os.getenv("KAFKA_BOOTSTRAP_SERVER"),
+                "enable.auto.commit": False,
+            }
+        )
+        topic = self.topic
+        try:
+            partitions = consumer.list_topics(topic, timeout=10).topics[topic].partitions
+            consumer.assign(
+                [TopicPartition(topic, partition, OFFSET_END) for partition in partitions]
+            )
+        except KafkaException as e:
+            make_log(
+                "WORK_SIGNAL",
+                30,
+                "trainer_workflow.log",
+                f"Not listening for work signals on {topic}: {str(e)}",
+            )
+            consumer.close()
+            return
+        try:
+            while True:
+                msg = consumer.poll(1.0)
+                if msg is None or msg.error():
+                    continue
+                self._loop.call_soon_threadsafe(self._event.set)
+        finally:
+            consumer.close()
+
+    def start_listening(self) -> None:
+        """Starts relaying remote signals to this process; called once per trainer"""
+        self._local_event()
+        if not self.topic:
+            make_log(
+                "WORK_SIGNAL",
+                30,
+                "trainer_workflow.log",
+                "WORK_AVAILABLE_TOPIC is not set, remote requests are picked up "
+                f"by polling, at most every {IDLE_MAX_SECONDS:g}s",
+            )
+        elif self._listener is None:
+            self._listener = threading.Thread(
+                target=self._listen, name="work-signal", daemon=True
+            )
+            self._listener.start()
+
+    async def wait(self, timeout: float) -> bool:
+        """Blocks until notified or timeout seconds pass
+
+        Returns:
+            bool: True if woken by a signal
+        """
+        event = self._local_event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            event.clear()
+
+
+work_signal = WorkSignal()
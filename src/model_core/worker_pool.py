@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from tortoise import Tortoise
+
+# Before the imports below and the reads here, which take settings at import
+# time; spawned workers import this module too, so they load it as well
+load_dotenv()
+
+from kafka.management.commands.signal import register_signal_handlers  # noqa: E402
+from model_core.forecasting import forecast_refresh_loop  # noqa: E402
+from model_core.services import service_loop  # noqa: E402
+from utils.logger import make_log  # noqa: E402
+from utils.tf_threads import configure_tf_threads, default_intra_op_threads  # noqa: E402
+
+POOL_SIZE = int(os.getenv("TRAINER_POOL_SIZE", "1"))
+INTRA_OP_THREADS = os.getenv("TRAINER_INTRA_OP_THREADS")
+INTER_OP_THREADS = int(os.getenv("TRAINER_INTER_OP_THREADS", "1"))
+# How long stopping workers get to flush and exit before they are killed
+SHUTDOWN_SECONDS = float(os.getenv("TRAINER_SHUTDOWN_SECONDS", "30"))
+
+
+async def _run_worker(worker_id: int) -> None:
+    await Tortoise.init(
+        db_url=os.getenv("DB_URL"),
+        modules={"models": ["database.models"]},
+    )
+    try:
+        if worker_id == 0:
+            # A single refresher is enough for the whole pool
+            await asyncio.gather(service_loop(), forecast_refresh_loop())
+        else:
+            await service_loop()
+    finally:
+        await Tortoise.close_connections()
+
+
+def _worker_main(
+    worker_id: int, intra_op_threads: int, inter_op_threads: int
+) -> None:
+    configure_tf_threads(intra_op_threads, inter_op_threads)
+    register_signal_handlers()
+    make_log(
+        "WORKER_POOL",
+        20,
+        "trainer_service.log",
+        f"Worker {worker_id} started (pid {os.getpid()}, intra={intra_op_threads}, inter={inter_op_threads})",
+    )
+    asyncio.run(_run_worker(worker_id))
+
+
+def _stop_workers(
+    workers: List[multiprocessing.Process], timeout: float = SHUTDOWN_SECONDS
+) -> None:
+    """Sends SIGTERM to the live workers, waits up to timeout for all of them, then kills the rest"""
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+    for worker in workers:
+        if worker.is_alive():
+            make_log(
+                "WORKER_POOL",
+                30,
+                "trainer_service.log",
+                f"Killing {worker.name}, still running {timeout:g}s after SIGTERM",
+            )
+            worker.kill()
+            worker.join()
+
+
+def run_worker_pool(
+    pool_size: int = POOL_SIZE,
+    intra_op_threads: Optional[int] = None,
+    inter_op_threads: int = INTER_OP_THREADS,
+    shutdown_seconds: float = SHUTDOWN_SECONDS,
+) -> None:
+    """Runs pool_size trainer processes, each with its own TensorFlow thread budget
+
+    SIGTERM or SIGINT to the parent is forwarded to the workers as SIGTERM, so
+    each flushes its events and exits; workers still running after
+    shutdown_seconds are killed.
+
+    Args:
+        pool_size (int, optional): Number of trainer processes. Defaults to TRAINER_POOL_SIZE.
+        intra_op_threads (Optional[int], optional): Threads per op in each worker.
+            Defaults to TRAINER_INTRA_OP_THREADS, or cpu_count // pool_size.
+        inter_op_threads (int, optional): Concurrent ops in each worker. Defaults to TRAINER_INTER_OP_THREADS.
+        shutdown_seconds (float, optional): Grace period of stopping workers. Defaults to TRAINER_SHUTDOWN_SECONDS.
+    """
+    if intra_op_threads is None:
+        intra_op_threads = (
+            int(INTRA_OP_THREADS)
+            if INTRA_OP_THREADS
+            else default_intra_op_threads(pool_size)
+        )
+
+    # Spawn so every worker starts with a fresh TensorFlow runtime
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=_worker_main,
+            args=(worker_id, intra_op_threads, inter_op_threads),
+            name=f"trainer-{worker_id}",
+        )
+        for worker_id in range(pool_size)
+    ]
+
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        make_log(
+            "WORKER_POOL",
+            20,
+            "trainer_service.log",
+            f"Signal received: {signum}, stopping trainer workers",
+        )
+        stopping.set()
+
+    previous = {
+        signum: signal.signal(signum, handle_signal)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        for worker in workers:
+            worker.start()
+        make_log(
+            "WORKER_POOL",
+            20,
+            "trainer_service.log",
+            f"Started {pool_size} trainer workers",
+        )
+        while not stopping.wait(1.0):
+            if not any(worker.is_alive() for worker in workers):
+                break
+    finally:
+        _stop_workers([w for w in workers if w.pid is not None], shutdown_seconds)
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+if __name__ == "__main__":
+    run_worker_pool()
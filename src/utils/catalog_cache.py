@@ -0,0 +1,114 @@
+import hashlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+from tortoise.functions import Count, Max
+
+from utils.logger import make_log
+
+CHECK_SECONDS = float(os.getenv("CATALOG_CHECK_SECONDS", "5"))
+
+ASSETS = "assets"
+MODEL_TYPES = "model_types"
+
+
+def etag_of(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers etag, weak tags included"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class CatalogCache:
+    """Serialized JSON bodies of the catalog tables, keyed by catalog name.
+
+    Writes in this process call invalidate() so the next read reloads. Writes made
+    by other processes (a trainer creating a model type, another API replica adding
+    assets) are caught by the catalog's version probe: a cheap query, e.g. row count
+    and max id, run at most every check_seconds, and the body is reloaded when its
+    result changes. Between checks a read is a dict lookup.
+    """
+
+    def __init__(self, check_seconds: float = CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        # name -> (checked at, version, body, etag)
+        self._entries: Dict[str, Tuple[float, Any, bytes, str]] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def get(
+        self,
+        name: str,
+        load: Callable[[], Awaitable[bytes]],
+        version: Callable[[], Awaitable[Any]],
+    ) -> Tuple[bytes, str]:
+        """Body and ETag of a catalog, loading it on a miss or a version change
+
+        Args:
+            name (str): Catalog name
+            load (Callable[[], Awaitable[bytes]]): Reads and serializes the catalog
+            version (Callable[[], Awaitable[Any]]): Cheap query that changes whenever the catalog does
+
+        Returns:
+            Tuple[bytes, str]: JSON body and its quoted ETag
+        """
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry[0] < self.check_seconds:
+            return entry[2], entry[3]
+
+        generation = self._generations.get(name, 0)
+        current = await version()
+        if entry is not None and entry[1] == current:
+            self._entries[name] = (time.monotonic(), current, entry[2], entry[3])
+            return entry[2], entry[3]
+
+        body = await load()
+        etag = etag_of(body)
+        # An invalidation during the load means the body may already be stale
+        if self._generations.get(name, 0) == generation:
+            self._entries[name] = (time.monotonic(), current, body, etag)
+        return body, etag
+
+    def invalidate(self, *names: str) -> None:
+        for name in names:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            self._entries.pop(name, None)
+        make_log(
+            "CATALOG_CACHE",
+            10,
+            "api_workflow.log",
+            f"Invalidated {', '.join(names)}",
+        )
+
+
+catalog_cache = CatalogCache()
+
+
+def table_version(model) -> Callable[[], Awaitable[Any]]:
+    """Version probe for an append-only table: its row count and largest id"""
+
+    async def version() -> Any:
+        return await model.annotate(rows=Count("id"), last=Max("id")).values_list(
+            "rows", "last")
+
+    return version
+
+
+async def catalog_response(
+    name: str,
+    load: Callable[[], Awaitable[bytes]],
+    version: Callable[[], Awaitable[Any]],
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """Cached catalog as a JSON response, or an empty 304 when the client's copy is current"""
+    body, etag = await catalog_cache.get(name, load, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,39 @@
+import os
+from typing import Optional, Tuple
+
+import tensorflow as tf
+
+# Intra-op threads this process was given, None until configure_tf_threads runs
+_intra_op_budget: Optional[int] = None
+
+
+def default_intra_op_threads(pool_size: int) -> int:
+    """Splits the available cores evenly so pool_size fits do not oversubscribe them"""
+    return max(1, (os.cpu_count() or 1) // pool_size)
+
+
+def configure_tf_threads(intra_op_threads: int, inter_op_threads: int) -> None:
+    """Must run before TensorFlow executes its first op in the process"""
+    global _intra_op_budget
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    _intra_op_budget = intra_op_threads
+
+
+def thread_budget() -> int:
+    """Cores this process may keep busy: its configured intra-op threads, or every
+    core when it runs outside the worker pool"""
+    if _intra_op_budget is not None:
+        return _intra_op_budget
+    return os.cpu_count() or 1
+
+
+def split_budget(workers: int, budget: Optional[int] = None) -> Tuple[int, int]:
+    """Divides this process's thread budget among up to workers child processes
+
+    Returns:
+        Tuple[int, int]: (number of workers, intra-op threads per worker)
+    """
+    budget = thread_budget() if budget is None else budget
+    workers = max(1, min(workers, budget))
+    return workers, max(1, budget // workers)
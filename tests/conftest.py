@@ -0,0 +1,28 @@
+import pytest
+from tortoise import Tortoise
+
+from database.models import Asset, ModelType, User
+
+
+@pytest.fixture
+async def db():
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["database.models"]}
+    )
+    await Tortoise.generate_schemas()
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.fixture
+async def catalog(db):
+    """One user, asset and model type to hang queue rows on"""
+    user = await User.create(username="user", email="user@typhoon", password="-")
+    asset = await Asset.create(ticker="TEST", name="Test", asset_type="EQUITY")
+    model_type = await ModelType.create(
+        model_name="LSTM",
+        description="",
+        default_hyperparameters={"units": 50},
+        default_model_architecture={},
+    )
+    return user, asset, model_type
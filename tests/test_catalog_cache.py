@@ -0,0 +1,55 @@
+import json
+
+from database.models import ModelType
+from utils.catalog_cache import CatalogCache, catalog_cache, catalog_response, table_version
+
+
+async def load_model_types() -> bytes:
+    return json.dumps(
+        list(await ModelType.all().values_list("model_name", flat=True))
+    ).encode()
+
+
+async def test_write_from_another_process_is_picked_up(catalog):
+    cache = CatalogCache(check_seconds=0)
+    body, etag = await cache.get("model_types", load_model_types, table_version(ModelType))
+    assert json.loads(body) == ["LSTM"]
+
+    # Written without invalidate(), as a trainer process would
+    await ModelType.create(
+        model_name="GRU", description="", default_hyperparameters={},
+        default_model_architecture={},
+    )
+    body, new_etag = await cache.get("model_types", load_model_types, table_version(ModelType))
+
+    assert sorted(json.loads(body)) == ["GRU", "LSTM"]
+    assert new_etag != etag
+
+
+async def test_unchanged_catalog_is_not_reloaded(catalog):
+    cache = CatalogCache(check_seconds=0)
+    loads = []
+
+    async def load() -> bytes:
+        loads.append(1)
+        return await load_model_types()
+
+    first = await cache.get("model_types", load, table_version(ModelType))
+    second = await cache.get("model_types", load, table_version(ModelType))
+
+    assert first == second
+    assert len(loads) == 1
+
+
+async def test_matching_etag_gets_304(catalog):
+    catalog_cache.invalidate("model_types")
+    response = await catalog_response("model_types", load_model_types, table_version(ModelType))
+    etag = response.headers["etag"]
+
+    cached = await catalog_response(
+        "model_types", load_model_types, table_version(ModelType), f"W/{etag}"
+    )
+
+    assert response.status_code == 200
+    assert cached.status_code == 304
+    assert cached.body == b""
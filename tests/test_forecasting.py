@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from database.models import Asset, Forecast, TrainedModel
+from model_core import forecasting
+
+
+async def trained_model(asset, model_type) -> TrainedModel:
+    return await TrainedModel.create(
+        asset=asset,
+        model_type=model_type,
+        model_name=model_type.model_name,
+        performance_metrics={},
+        hyperparameters={},
+        model_architecture={},
+        training_performance={},
+        normalization={},
+    )
+
+
+async def test_refresh_only_touches_latest_model_per_asset_and_type(catalog, monkeypatch):
+    _, asset, model_type = catalog
+    other_asset = await Asset.create(ticker="OTHER", name="Other", asset_type="EQUITY")
+    superseded = await trained_model(asset, model_type)
+    latest = await trained_model(asset, model_type)
+    other = await trained_model(other_asset, model_type)
+    for model in (superseded, latest, other):
+        await Forecast.create(
+            trained_model=model, asset_id=model.asset_id, horizon=1,
+            last_bar_date="2024-01-01", values=[],
+        )
+
+    loaded = []
+
+    async def get(trained_model_id):
+        loaded.append(trained_model_id)
+        return SimpleNamespace(model=None, normalization={})
+
+    monkeypatch.setattr(forecasting, "data_init", lambda ticker: pd.DataFrame({"Date": ["2024-01-02"]}))
+    monkeypatch.setattr(forecasting.model_cache, "get", get)
+    monkeypatch.setattr(
+        forecasting, "compute_forecast",
+        lambda model, ticker, normalization: ("2024-01-02", [{"date": "2024-01-03", "close": 1.0}]),
+    )
+
+    assert await forecasting.refresh_forecasts() == 2
+    assert sorted(loaded) == sorted([latest.id, other.id])
+    assert (await Forecast.get(trained_model_id=superseded.id)).last_bar_date == "2024-01-01"
+
+
+async def test_read_cache_is_bounded(catalog, monkeypatch):
+    _, asset, model_type = catalog
+    monkeypatch.setattr(forecasting, "READ_CACHE_SIZE", 2)
+    forecasting._read_cache.clear()
+    models = [await trained_model(asset, model_type) for _ in range(3)]
+    for model in models:
+        await Forecast.create(
+            trained_model=model, asset_id=asset.id, horizon=0,
+            last_bar_date="2024-01-01", values=[],
+        )
+        await forecasting.read_forecast(model.id)
+
+    assert list(forecasting._read_cache) == [models[1].id, models[2].id]
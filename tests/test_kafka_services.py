@@ -0,0 +1,94 @@
+import json
+
+from confluent_kafka import TopicPartition
+
+from database.models import Queue
+from kafka.services import QueueConsumer, decode_messages, enqueue_with_retries
+
+
+class FakeMessage:
+    def __init__(self, value: dict, offset: int):
+        self._value = json.dumps(value).encode("utf-8")
+        self._offset = offset
+
+    def value(self) -> bytes:
+        return self._value
+
+    def key(self):
+        return None
+
+    def topic(self) -> str:
+        return "train"
+
+    def partition(self) -> int:
+        return 0
+
+    def offset(self) -> int:
+        return self._offset
+
+    def error(self):
+        return None
+
+
+async def test_unknown_ids_are_rejected_not_enqueued(catalog):
+    user, asset, model_type = catalog
+    messages = [
+        FakeMessage({"user_id": user.id, "asset_id": asset.id, "model_type_id": model_type.id}, 0),
+        FakeMessage({"user_id": user.id, "asset_id": 9999, "model_type_id": model_type.id}, 1),
+        FakeMessage({"user_id": 9999, "asset_id": asset.id, "model_type_id": model_type.id}, 2),
+    ]
+    decoded, _ = decode_messages(messages)
+
+    rejected = await enqueue_with_retries(decoded)
+
+    assert [msg.offset() for msg, _ in rejected] == [1, 2]
+    assert await Queue.filter(asset_id=asset.id).count() == 1
+    assert not await Queue.exists(asset_id=9999)
+
+
+class FakeConsumer:
+    def __init__(self):
+        self.assigned = []
+        self.paused = []
+        self.seeks = []
+
+    def assign(self, partitions):
+        self.assigned = list(partitions)
+
+    def assignment(self):
+        return self.assigned
+
+    def pause(self, partitions):
+        self.paused.extend((tp.topic, tp.partition) for tp in partitions)
+
+    def resume(self, partitions):
+        pass
+
+    def seek(self, partition):
+        self.seeks.append(partition.offset)
+
+
+def test_partitions_assigned_while_throttled_start_paused():
+    fake = FakeConsumer()
+    consumer = QueueConsumer(consumer=fake)
+    consumer.throttled = True
+    consumer._on_assign(fake, [TopicPartition("train", 0), TopicPartition("train", 1)])
+
+    assert fake.paused == [("train", 0), ("train", 1)]
+
+
+async def test_rewind_drops_messages_fetched_before_the_seek():
+    consumer = QueueConsumer(consumer=FakeConsumer(), batch_size=1)
+    consumer._dispatch([FakeMessage({}, offset) for offset in range(3)])
+    key = ("train", 0)
+    buffer = consumer._buffers[key]
+    try:
+        consumer._rewind(key, buffer, 0)
+        # The rest of a consume() that was running during the seek, then the rewound ones
+        consumer._dispatch([FakeMessage({}, 3), FakeMessage({}, 4)])
+        consumer._dispatch([FakeMessage({}, offset) for offset in range(5)])
+
+        assert [buffer.get_nowait().offset() for _ in range(buffer.qsize())] == [0, 1, 2, 3, 4]
+        assert consumer.consumer.seeks == [0]
+    finally:
+        consumer._workers[key].cancel()
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from tortoise import timezone
+
+from database.models import Queue
+from model_core.queue_lease import IN_PROGRESS, QueueLease
+
+
+async def enqueue(catalog) -> Queue:
+    user, asset, model_type = catalog
+    return await Queue.create(user=user, asset=asset, model_type=model_type)
+
+
+async def expire(queue_item: Queue) -> None:
+    await Queue.filter(id=queue_item.id).update(
+        lease_expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+
+async def test_claim_is_exclusive(catalog):
+    queue_item = await enqueue(catalog)
+    first, second = QueueLease("w1"), QueueLease("w2")
+
+    claimed = await first.claim()
+
+    assert claimed.id == queue_item.id
+    assert claimed.status == IN_PROGRESS
+    assert claimed.claimed_by == "w1"
+    assert await second.claim() is None
+
+
+async def test_expired_lease_can_be_reclaimed(catalog):
+    queue_item = await enqueue(catalog)
+    first, second = QueueLease("w1"), QueueLease("w2")
+    await first.claim()
+    await expire(queue_item)
+
+    claimed = await second.claim()
+
+    assert claimed.id == queue_item.id
+    assert claimed.claimed_by == "w2"
+    assert claimed.lease_expires_at > timezone.now()
+
+
+async def test_renew_fails_after_losing_the_lease(catalog):
+    queue_item = await enqueue(catalog)
+    first, second = QueueLease("w1"), QueueLease("w2")
+    claimed = await first.claim()
+    assert await first.renew(claimed)
+
+    await expire(queue_item)
+    await second.claim()
+
+    assert not await first.renew(claimed)
+    assert not await first.holds(claimed)
+    assert await second.holds(claimed)
+
+
+async def test_only_the_holder_completes(catalog):
+    queue_item = await enqueue(catalog)
+    first, second = QueueLease("w1"), QueueLease("w2")
+    claimed = await first.claim()
+    await expire(queue_item)
+    await second.claim()
+
+    assert not await first.complete(claimed)
+    assert await Queue.exists(id=queue_item.id)
+
+    assert await second.complete(claimed)
+    assert not await Queue.exists(id=queue_item.id)
@@ -0,0 +1,64 @@
+from database.models import Queue, RequestSubscription, User
+from model_core.request_coalescing import (
+    ATTACHED,
+    DUPLICATE,
+    QUEUED,
+    EnqueueRequest,
+    enqueue_request,
+    enqueue_requests,
+)
+
+
+async def test_priority_requester_promotes_the_job_it_attaches_to(catalog):
+    user, asset, model_type = catalog
+    vip = await User.create(username="vip", email="vip@typhoon", password="-", priority=True)
+
+    outcome, queue_id = await enqueue_request(user.id, asset.id, model_type)
+    assert outcome == QUEUED
+    assert not (await Queue.get(id=queue_id)).priority
+
+    outcome, attached_id = await enqueue_request(vip.id, asset.id, model_type, priority=True)
+
+    assert (outcome, attached_id) == (ATTACHED, queue_id)
+    assert (await Queue.get(id=queue_id)).priority
+
+
+async def test_batch_priority_requester_promotes_existing_job(catalog):
+    user, asset, model_type = catalog
+    vip = await User.create(username="vip", email="vip@typhoon", password="-", priority=True)
+    _, queue_id = await enqueue_request(user.id, asset.id, model_type)
+
+    results = await enqueue_requests(
+        [EnqueueRequest(user_id=vip.id, asset_id=asset.id, model_type=model_type, priority=True)]
+    )
+
+    assert results == [(ATTACHED, queue_id)]
+    assert (await Queue.get(id=queue_id)).priority
+
+
+async def test_concurrent_duplicate_key_is_reported_as_duplicate(catalog, monkeypatch):
+    user, asset, model_type = catalog
+    await enqueue_request(user.id, asset.id, model_type, request_key="k1")
+    subscription = await RequestSubscription.get(request_key="k1")
+
+    # The early key lookup misses, as when both requests check before either inserts
+    class Missing:
+        async def first(self):
+            return None
+
+    original_filter = RequestSubscription.filter
+    calls = []
+
+    def filter_once(*args, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            return Missing()
+        return original_filter(*args, **kwargs)
+
+    monkeypatch.setattr(RequestSubscription, "filter", filter_once)
+
+    assert await enqueue_request(user.id, asset.id, model_type, request_key="k1") == (
+        DUPLICATE,
+        subscription.id,
+    )
+    assert await RequestSubscription.filter(request_key="k1").count() == 1
@@ -0,0 +1,30 @@
+from database.models import Queue, User
+from model_core.queue_lease import QueueLease
+from model_core.scheduler import FairShareScheduler
+
+
+async def test_single_user_is_not_held_to_their_cap(catalog):
+    user, asset, model_type = catalog
+    for _ in range(3):
+        await Queue.create(user=user, asset=asset, model_type=model_type)
+    scheduler = FairShareScheduler()
+
+    claimed = [await scheduler.next(QueueLease(f"w{i}")) for i in range(3)]
+
+    assert all(queue_item is not None for queue_item in claimed)
+    assert len({queue_item.id for queue_item in claimed}) == 3
+
+
+async def test_cap_gives_way_to_other_users(catalog):
+    user, asset, model_type = catalog
+    other = await User.create(username="other", email="other@typhoon", password="-")
+    for _ in range(2):
+        await Queue.create(user=user, asset=asset, model_type=model_type)
+    waiting = await Queue.create(user=other, asset=asset, model_type=model_type)
+    scheduler = FairShareScheduler()
+
+    first = await scheduler.next(QueueLease("w1"))
+    second = await scheduler.next(QueueLease("w2"))
+
+    assert first.user_id == user.id
+    assert second.id == waiting.id
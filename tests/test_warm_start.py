@@ -0,0 +1,28 @@
+import json
+
+from database.models import TrainedModel
+from model_core import warm_start
+
+
+async def trained_model(asset, model_type, hyperparameters) -> TrainedModel:
+    return await TrainedModel.create(
+        asset=asset,
+        model_type=model_type,
+        model_name=model_type.model_name,
+        performance_metrics={},
+        hyperparameters=json.dumps(hyperparameters),
+        model_architecture={},
+        training_performance={},
+        normalization={},
+    )
+
+
+async def test_searched_model_is_found_with_its_hyperparameters(catalog):
+    _, asset, model_type = catalog
+    await trained_model(asset, model_type, {"units": 50})
+    searched = await trained_model(asset, model_type, {"units": 96})
+
+    previous = await warm_start.find_warm_start_model(asset.id, model_type.id)
+
+    assert previous.id == searched.id
+    assert warm_start.hyperparameters_of(previous) == {"units": 96}
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_core.model_utils import window_pipeline
+from model_core.model_utils.data_cache import OHLCVCache
+
+
+def make_bars(start: str, end: str) -> pd.DataFrame:
+    index = pd.bdate_range(start, end, inclusive="left", name="Date")
+    close = np.linspace(100.0, 120.0, len(index))
+    return pd.DataFrame(
+        {
+            "Open": close - 1,
+            "High": close + 1,
+            "Low": close - 2,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": np.full(len(index), 1000.0),
+            "Dividends": np.zeros(len(index)),
+        },
+        index=index,
+    )
+
+
+class Downloader:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((start, end))
+        return None if self.fail else make_bars(start, end)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = OHLCVCache(Downloader(), cache_dir=str(tmp_path))
+    monkeypatch.setattr(window_pipeline, "ohlcv_cache", cache)
+    return cache
+
+
+def test_data_init_drops_columns_starting_at_zero(cache):
+    df = window_pipeline.data_init("TEST", "2024-01-01", "2024-03-01")
+
+    assert "Date" in df.columns
+    assert "Dividends" not in df.columns
+    assert {"Open", "High", "Low", "Close", "Volume"} <= set(df.columns)
+    assert len(df) == len(pd.bdate_range("2024-01-01", "2024-03-01", inclusive="left"))
+
+
+def test_data_init_keeps_frames_without_zero_columns(cache):
+    cache.downloader = lambda *args: make_bars(args[1], args[2]).drop(columns="Dividends")
+
+    df = window_pipeline.data_init("TEST", "2024-01-01", "2024-03-01")
+
+    assert list(df.columns) == ["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def test_failed_download_does_not_extend_coverage(cache):
+    cache.get("TEST", "2024-01-01", "2024-02-01", "1d")
+    cache.downloader = Downloader(fail=True)
+    cache.get("TEST", "2024-01-01", "2024-03-01", "1d")
+
+    assert cache._read_meta("TEST", "1d")["covered_end"] == "2024-02-01"
+
+    cache.downloader = Downloader()
+    df = cache.get("TEST", "2024-01-01", "2024-03-01", "1d")
+
+    assert cache.downloader.calls == [("2024-02-01", "2024-03-01")]
+    assert df.index.max() >= pd.Timestamp("2024-02-29", tz="UTC")
+
+
+def test_empty_download_extends_coverage(cache):
+    cache.get("TEST", "2024-01-01", "2024-02-01", "1d")
+    cache.downloader = lambda *args: pd.DataFrame()
+    cache.get("TEST", "2023-12-01", "2024-03-01", "1d")
+
+    meta = cache._read_meta("TEST", "1d")
+    assert (meta["covered_start"], meta["covered_end"]) == ("2023-12-01", "2024-03-01")
+
+
+def test_empty_download_covers_only_closed_sessions(cache):
+    cache.get("TEST", "2024-01-01", "2024-02-01", "1d")
+    cache.downloader = lambda *args: pd.DataFrame()
+    end = (pd.Timestamp.now(tz="UTC") + pd.Timedelta(days=3)).strftime("%Y-%m-%d")
+    cache.get("TEST", "2024-01-01", end, "1d")
+
+    assert cache._read_meta("TEST", "1d")["covered_end"] < end
+
+
+def test_raising_download_does_not_extend_coverage(cache):
+    cache.get("TEST", "2024-01-01", "2024-02-01", "1d")
+
+    def downloader(*args):
+        raise ConnectionError("timed out")
+
+    cache.downloader = downloader
+    df = cache.get("TEST", "2024-01-01", "2024-03-01", "1d")
+
+    assert cache._read_meta("TEST", "1d")["covered_end"] == "2024-02-01"
+    assert df.index.max() < pd.Timestamp("2024-02-01", tz="UTC")
+
+
+
+def test_incremental_window_trains_on_new_and_replayed_bars(cache):
+    df = window_pipeline.feature_engineering(window_pipeline.data_init("TEST"))
+    normalization = window_pipeline.normalization_stats(df[: len(df) - 1])
+    since = pd.to_datetime(window_pipeline.data_init("TEST")["Date"], utc=True).iloc[-2]
+
+    window = window_pipeline.incremental_data_processing(
+        "TEST", since, 40, 35, normalization)
+
+    # A single new bar after 40 replayed ones, and a validation tail of its own
+    assert len(window.train_df) == 41
+    assert len(window.val_df) == 35
+    assert window.normalization is normalization
+    expected = (df["Close"].iloc[-1] - normalization["mean"]["Close"]) / normalization["std"]["Close"]
+    assert window.train_df["Close"].iloc[-1] == pytest.approx(expected)
+
+
+def test_incremental_window_needs_a_long_enough_validation_tail(cache):
+    df = window_pipeline.feature_engineering(window_pipeline.data_init("TEST"))
+    normalization = window_pipeline.normalization_stats(df)
+    since = pd.to_datetime(window_pipeline.data_init("TEST")["Date"], utc=True).iloc[-2]
+
+    assert window_pipeline.incremental_data_processing(
+        "TEST", since, 40, 20, normalization) is None